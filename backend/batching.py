@@ -0,0 +1,67 @@
+import time
+import queue
+import threading
+from concurrent.futures import Future
+
+import numpy as np
+
+from backend.instrumentation import record
+
+
+class BatchingEncoder:
+    """
+    Drop-in for SharedModel.encode that groups concurrent calls into one
+    model.encode. The first waiting request opens a batch; requests that
+    arrive within max_wait seconds join it, up to max_batch texts.
+    """
+
+    def __init__(self, model, max_batch=64, max_wait=0.005):
+        self.model = model
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.requests = queue.Queue()
+        self.worker = threading.Thread(target=self._run, name="encoder", daemon=True)
+        self.worker.start()
+
+    def encode(self, texts, **kwargs):
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        future = Future()
+        self.requests.put((texts, future))
+        return future.result()
+
+    def _collect(self):
+        batch = [self.requests.get()]
+        size = len(batch[0][0])
+        deadline = time.perf_counter() + self.max_wait
+        while size < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self.requests.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(item)
+            size += len(item[0])
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            texts = [t for item, _ in batch for t in item]
+            start = time.perf_counter()
+            try:
+                vectors = self.model.encode(texts, convert_to_numpy=True)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            record("encode.batch", start, time.perf_counter() - start,
+                   requests=len(batch), texts=len(texts))
+
+            offset = 0
+            for item, future in batch:
+                future.set_result(vectors[offset:offset + len(item)])
+                offset += len(item)
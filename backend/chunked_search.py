@@ -0,0 +1,228 @@
+import os
+import json
+import hashlib
+
+import numpy as np
+
+from backend.semantic_search import ResumeSemanticSearch, MODEL_NAME
+from backend.vector_index import normalize_rows, top_k_indices
+from backend.instrumentation import instrument
+
+# Section prefixes, matching the wording of build_search_text
+CHUNK_SECTIONS = {
+    "skills": "The candidate has skills in ",
+    "projects": "The candidate has worked on projects such as ",
+    "experience": "The candidate has professional experience including ",
+    "achievements": "The candidate achieved "
+}
+
+# MiniLM reads at most 256 word pieces; 128 words stays safely below that
+CHUNK_WORDS = 128
+CHUNK_OVERLAP = 32
+
+
+def chunk_sections(sections, chunk_words=CHUNK_WORDS, overlap=CHUNK_OVERLAP):
+    """
+    Splits a resume into the texts that are embedded separately: one per
+    section, with long sections cut into overlapping word windows.
+    """
+    chunks = []
+    step = max(1, chunk_words - overlap)
+    for name, prefix in CHUNK_SECTIONS.items():
+        words = (sections.get(name) or "").split()
+        if not words:
+            continue
+        start = 0
+        while True:
+            chunks.append(prefix + " ".join(words[start:start + chunk_words]))
+            if start + chunk_words >= len(words):
+                break
+            start += step
+    return chunks
+
+
+def _chunks_key(chunks, model_name):
+    h = hashlib.sha256(model_name.encode("utf-8"))
+    for chunk in chunks:
+        h.update(b"\0")
+        h.update(chunk.encode("utf-8"))
+    return h.hexdigest()
+
+
+class ChunkedResumeSearch(ResumeSemanticSearch):
+    """
+    Multi-vector variant of ResumeSemanticSearch: every section (or word
+    window of a long section) gets its own vector, so nothing is lost to
+    the encoder's length limit.
+
+    Chunk vectors of all resumes sit in one flat array; resume i owns rows
+    offsets[i]:offsets[i + 1]. A query is scored against every chunk in
+    one matrix product and reduced per resume with np.*.reduceat, either
+    by the best chunk ("max") or a softmax-weighted sum that favours the
+    best chunks but credits several matching sections ("weighted").
+    """
+
+    def __init__(self, model_name=MODEL_NAME, cache_dir=None, aggregate="max",
+                 temperature=0.05, encoder=None):
+        if aggregate not in ("max", "weighted"):
+            raise ValueError(f"Unknown aggregate: {aggregate}")
+        super().__init__(model_name, cache_dir=cache_dir, encoder=encoder)
+        self.aggregate = aggregate
+        self.temperature = temperature
+        self.vectors = np.zeros((0, 0), dtype=np.float32)
+        self.offsets = np.zeros(1, dtype=np.int64)
+
+    @property
+    def embeddings(self):
+        return self.vectors
+
+    def _chunks(self, resume_data):
+        ids, chunks = [], []
+        for r in resume_data:
+            ids.append(r.get("Resume") or r.get("resume"))
+            if "chunks" in r:
+                chunks.append(list(r["chunks"]))
+            else:
+                # An empty resume keeps one empty chunk so every resume
+                # owns at least one row
+                chunks.append(chunk_sections(r["sections"]) or [""])
+        return ids, chunks
+
+    def _blocks(self):
+        return [self.vectors[a:b] for a, b in zip(self.offsets[:-1], self.offsets[1:])]
+
+    def _rebuild(self, blocks):
+        sizes = [len(b) for b in blocks]
+        self.offsets = np.concatenate(([0], np.cumsum(sizes))).astype(np.int64)
+        self.vectors = np.concatenate(blocks) if blocks else np.zeros((0, 0), dtype=np.float32)
+        self._reposition()
+
+    def add(self, resume_data):
+        ids, _ = self._chunks(resume_data)
+        duplicates = [r for r in ids if r in self.positions]
+        if duplicates or len(set(ids)) != len(ids):
+            raise ValueError(f"Resumes already indexed: {duplicates or ids}")
+        self.upsert(resume_data)
+
+    def remove(self, resume_ids):
+        drop = {self.positions[r] for r in resume_ids if r in self.positions}
+        if not drop:
+            return 0
+
+        keep = [i for i in range(len(self.resume_ids)) if i not in drop]
+        blocks = self._blocks()
+        self.resume_ids = [self.resume_ids[i] for i in keep]
+        self.text_keys = [self.text_keys[i] for i in keep]
+        self._rebuild([blocks[i] for i in keep])
+        return len(drop)
+
+    @instrument("chunked.upsert", lambda args, kwargs, result: {"batch": len(args[1]), "embedded": result})
+    def upsert(self, resume_data):
+        ids, chunk_lists = self._chunks(resume_data)
+
+        changed = {}
+        for resume_id, chunks in zip(ids, chunk_lists):
+            key = _chunks_key(chunks, self.model_name)
+            pos = self.positions.get(resume_id)
+            if pos is not None and self.text_keys[pos] == key:
+                changed.pop(resume_id, None)
+                continue
+            changed[resume_id] = (chunks, key)
+
+        if not changed:
+            return 0
+
+        # Every chunk of every changed resume goes through one encode call
+        texts = [c for chunks, _ in changed.values() for c in chunks]
+        vectors = normalize_rows(self.embed(texts))
+
+        blocks = self._blocks()
+        start = 0
+        for resume_id, (chunks, key) in changed.items():
+            block = vectors[start:start + len(chunks)]
+            start += len(chunks)
+            pos = self.positions.get(resume_id)
+            if pos is None:
+                self.resume_ids.append(resume_id)
+                self.text_keys.append(key)
+                blocks.append(block)
+            else:
+                self.text_keys[pos] = key
+                blocks[pos] = block
+
+        self._rebuild(blocks)
+        return len(changed)
+
+    def _aggregate(self, chunk_scores, offsets=None):
+        offsets = self.offsets if offsets is None else offsets
+        starts = offsets[:-1]
+        if self.aggregate == "max":
+            return np.maximum.reduceat(chunk_scores, starts, axis=1)
+
+        # Softmax over each resume's chunks, shifted by its best score
+        # so the exponentials stay in range
+        best = np.maximum.reduceat(chunk_scores, starts, axis=1)
+        owner = np.repeat(np.arange(len(starts)), np.diff(offsets))
+        weights = np.exp((chunk_scores - best[:, owner]) / self.temperature)
+        return (
+            np.add.reduceat(weights * chunk_scores, starts, axis=1)
+            / np.add.reduceat(weights, starts, axis=1)
+        )
+
+    def score_queries(self, queries):
+        if len(self.resume_ids) == 0:
+            return np.zeros((len(queries), 0), dtype=np.float32)
+        return self._aggregate(self.encode_queries(queries) @ self.vectors.T)
+
+    def score_resumes(self, queries, resume_ids):
+        positions = np.array([self.positions[r] for r in resume_ids], dtype=np.int64)
+        if not len(positions):
+            return np.zeros((len(queries), 0), dtype=np.float32)
+
+        starts, stops = self.offsets[positions], self.offsets[positions + 1]
+        rows = np.concatenate([np.arange(a, b) for a, b in zip(starts, stops)])
+        offsets = np.concatenate(([0], np.cumsum(stops - starts)))
+        return self._aggregate(self.encode_queries(queries) @ self.vectors[rows].T, offsets)
+
+    def search_vectors(self, query_vectors, top_k=5):
+        if len(self.resume_ids) == 0:
+            return [[] for _ in query_vectors]
+
+        hits = []
+        for row in self._aggregate(np.asarray(query_vectors) @ self.vectors.T):
+            idx = top_k_indices(row, top_k)
+            hits.append([(self.resume_ids[i], float(row[i])) for i in idx])
+        return hits
+
+    def save_index(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        np.savez(os.path.join(directory, "chunks.npz"), vectors=self.vectors, offsets=self.offsets)
+
+        meta_path = os.path.join(directory, "meta.json")
+        with open(meta_path + ".tmp", "w") as f:
+            json.dump({
+                "model": self.model_name,
+                "chunking": [CHUNK_WORDS, CHUNK_OVERLAP],
+                "resume_ids": self.resume_ids,
+                "text_keys": self.text_keys
+            }, f)
+        os.replace(meta_path + ".tmp", meta_path)
+
+    def load_index(self, directory):
+        meta_path = os.path.join(directory, "meta.json")
+        chunks_path = os.path.join(directory, "chunks.npz")
+        if not os.path.exists(meta_path) or not os.path.exists(chunks_path):
+            return False
+
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta.get("model") != self.model_name or meta.get("chunking") != [CHUNK_WORDS, CHUNK_OVERLAP]:
+            return False
+
+        with np.load(chunks_path) as data:
+            self.vectors = data["vectors"]
+            self.offsets = data["offsets"]
+        self.resume_ids = meta["resume_ids"]
+        self.text_keys = meta["text_keys"]
+        self._reposition()
+        return True
@@ -0,0 +1,184 @@
+import zlib
+import hashlib
+
+import numpy as np
+
+from backend.lexical_index import TOKEN_PATTERN
+
+# Word 3-grams: one edited word changes 3 shingles, so a resume sent
+# again with a few fixes still shares most of its shingles
+SHINGLE_WORDS = 3
+NUM_PERM = 128
+
+# 32 bands of 4 rows make any pair above ~0.5 Jaccard a candidate; the
+# candidates are then checked against DUPLICATE_THRESHOLD. Different
+# resumes rarely share more than 15% of their shingles.
+LSH_BANDS = 32
+DUPLICATE_THRESHOLD = 0.7
+
+# Random odd multipliers: x -> a * x + b (mod 2**32) permutes 32-bit
+# hashes, one permutation per row of the signature
+_rng = np.random.default_rng(1)
+_A = (_rng.integers(0, 2 ** 31, NUM_PERM, dtype=np.uint32) * np.uint32(2) + np.uint32(1))[:, None]
+_B = _rng.integers(0, 2 ** 32, NUM_PERM, dtype=np.uint64).astype(np.uint32)[:, None]
+_MIX = np.uint32(0x9E3779B1)
+
+
+def resume_text(sections):
+    return " ".join(sections[name] or "" for name in sorted(sections))
+
+
+def fingerprint(text):
+    """
+    (digest, minhash) of a resume's text, or None when it has no words.
+    digest identifies exact copies (ignoring case, spacing and
+    punctuation); minhash estimates the Jaccard similarity of the word
+    shingles of two resumes.
+    """
+    words = TOKEN_PATTERN.findall(text.lower())
+    if not words:
+        return None
+
+    digest = hashlib.sha256(" ".join(words).encode("utf-8")).hexdigest()
+
+    # Shingle hashes are combined from word hashes with array ops, so
+    # only the words themselves are hashed in Python
+    hashes = np.fromiter(
+        (zlib.crc32(w.encode("utf-8")) for w in words), dtype=np.uint32, count=len(words)
+    )
+    k = min(SHINGLE_WORDS, len(words))
+    n = len(words) - k + 1
+    shingles = hashes[:n].copy()
+    for j in range(1, k):
+        shingles = shingles * _MIX ^ hashes[j:j + n]
+    minhash = (_A * np.unique(shingles) + _B).min(axis=1)
+    return digest, minhash
+
+
+def similarity(a, b):
+    """
+    Estimated Jaccard similarity of two minhash signatures.
+    """
+    return float(np.mean(a == b))
+
+
+class DuplicateIndex:
+    """
+    Fingerprints of a pool, looked up with locality-sensitive hashing:
+    each signature is cut into LSH_BANDS bands and only resumes sharing a
+    whole band with the query are compared, so a lookup touches a few
+    buckets instead of every resume.
+    """
+
+    def __init__(self, threshold=DUPLICATE_THRESHOLD, bands=LSH_BANDS):
+        if NUM_PERM % bands:
+            raise ValueError(f"{NUM_PERM} permutations do not split into {bands} bands")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = NUM_PERM // bands
+        self.fingerprints = {}  # resume_id -> (digest, minhash)
+        self.digests = {}  # digest -> resume_id
+        self.buckets = [{} for _ in range(bands)]
+
+    def __len__(self):
+        return len(self.fingerprints)
+
+    def __contains__(self, resume_id):
+        return resume_id in self.fingerprints
+
+    def _keys(self, minhash):
+        return [minhash[b * self.rows:(b + 1) * self.rows].tobytes() for b in range(self.bands)]
+
+    def add(self, resume_id, fp):
+        self.remove(resume_id)
+        if fp is None:
+            return
+        digest, minhash = fp
+        self.fingerprints[resume_id] = fp
+        self.digests.setdefault(digest, resume_id)
+        for bucket, key in zip(self.buckets, self._keys(minhash)):
+            bucket.setdefault(key, set()).add(resume_id)
+
+    def remove(self, resume_id):
+        fp = self.fingerprints.pop(resume_id, None)
+        if fp is None:
+            return
+        digest, minhash = fp
+        if self.digests.get(digest) == resume_id:
+            del self.digests[digest]
+        for bucket, key in zip(self.buckets, self._keys(minhash)):
+            ids = bucket[key]
+            ids.discard(resume_id)
+            if not ids:
+                del bucket[key]
+
+    def find(self, fp, exclude=()):
+        """
+        (resume_id, similarity) of the closest resume at or above the
+        threshold, or None. `exclude` is an id or a set of ids never
+        reported, such as the resume's own id, so a changed version of it
+        is not reported as its own duplicate.
+        """
+        if fp is None:
+            return None
+        exclude = {exclude} if isinstance(exclude, str) else set(exclude)
+        digest, minhash = fp
+        owner = self.digests.get(digest)
+        if owner is not None and owner not in exclude:
+            return owner, 1.0
+
+        candidates = set()
+        for bucket, key in zip(self.buckets, self._keys(minhash)):
+            candidates.update(bucket.get(key, ()))
+        candidates -= exclude
+
+        best = None
+        for resume_id in sorted(candidates):
+            score = similarity(minhash, self.fingerprints[resume_id][1])
+            if score >= self.threshold and (best is None or score > best[1]):
+                best = (resume_id, score)
+        return best
+
+
+def collapse_duplicates(results, index=None):
+    """
+    Splits ingest results into (unique, duplicates) before they are
+    stored and embedded. Each result is checked against `index` (the pool
+    so far, see ResumeStore.duplicate_index) and the unique results of
+    the batch; the first of a group, by name, is kept. A name listed
+    twice in the batch keeps its first copy.
+
+    `index` is not changed: pooled resumes named in the batch are about
+    to be replaced, so they are never reported as the original.
+
+    duplicates is [{"resume", "duplicate_of", "similarity"}, ...].
+    """
+    pool = DuplicateIndex() if index is None else index
+    batch = DuplicateIndex(pool.threshold, pool.bands)
+    names = {r["resume"] for r in results}
+    kept = {}  # resume_id -> fingerprint of the copy kept
+    unique, duplicates = [], []
+    for r in sorted(results, key=lambda r: r["resume"]):
+        fp = fingerprint(resume_text(r["sections"]))
+        if r["resume"] in kept:
+            first = kept[r["resume"]]
+            duplicates.append({
+                "resume": r["resume"],
+                "duplicate_of": r["resume"],
+                "similarity": round(similarity(fp[1], first[1]), 3) if fp and first else float(fp is first)
+            })
+            continue
+
+        matches = [m for m in (batch.find(fp), pool.find(fp, exclude=names)) if m]
+        if not matches:
+            batch.add(r["resume"], fp)
+            kept[r["resume"]] = fp
+            unique.append(r)
+        else:
+            match = max(matches, key=lambda m: m[1])
+            duplicates.append({
+                "resume": r["resume"],
+                "duplicate_of": match[0],
+                "similarity": round(match[1], 3)
+            })
+    return unique, duplicates
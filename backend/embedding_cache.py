@@ -0,0 +1,209 @@
+import os
+import re
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+def embedding_key(text, model_name):
+    h = hashlib.sha256()
+    h.update(model_name.encode("utf-8"))
+    h.update(b"\0")
+    h.update(text.encode("utf-8"))
+    return h.hexdigest()
+
+
+_open_caches = {}
+_open_lock = threading.Lock()
+
+
+def open_cache(cache_dir, model_name, capacity=20000):
+    """
+    Returns the process-wide cache for (cache_dir, model_name) so every
+    search engine in the process writes through the same index.
+    """
+    key = (os.path.abspath(cache_dir), model_name)
+    with _open_lock:
+        cache = _open_caches.get(key)
+        if cache is None:
+            cache = EmbeddingCache(cache_dir, model_name, capacity)
+            _open_caches[key] = cache
+    return cache
+
+
+def _safe_name(model_name):
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", model_name)
+
+
+class EmbeddingCache:
+    """
+    On-disk embedding store for one model.
+
+    Vectors live in a memory-mapped float32 file with `capacity` rows and
+    index.json maps content keys to rows, oldest first. When the store is
+    full the least recently used row is reused.
+    """
+
+    def __init__(self, cache_dir, model_name, capacity=20000):
+        self.model_name = model_name
+        self.capacity = capacity
+        self.dir = os.path.join(cache_dir, _safe_name(model_name))
+        self.index_path = os.path.join(self.dir, "index.json")
+        self.vectors_path = os.path.join(self.dir, "vectors.f32")
+
+        self.dim = None
+        self.vectors = None
+        self.rows = OrderedDict()
+        self.dirty = False
+        self.lock = threading.Lock()
+
+        os.makedirs(self.dir, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.index_path):
+            return
+
+        try:
+            with open(self.index_path) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        # A different model or capacity means the rows no longer line up
+        if meta.get("model") != self.model_name or meta.get("capacity") != self.capacity:
+            return
+        # A vectors file of the wrong size (e.g. a crash mid-write) would be
+        # recreated as zeros, so its rows are dropped with it
+        size = self.capacity * meta["dim"] * 4
+        if not os.path.exists(self.vectors_path) or os.path.getsize(self.vectors_path) != size:
+            return
+
+        self._open_vectors(meta["dim"])
+        self.rows = OrderedDict((k, row) for k, row in meta["rows"])
+
+    def _open_vectors(self, dim):
+        self.dim = dim
+        size = self.capacity * dim * 4
+        if os.path.exists(self.vectors_path) and os.path.getsize(self.vectors_path) == size:
+            mode = "r+"
+        else:
+            mode = "w+"
+        self.vectors = np.memmap(
+            self.vectors_path, dtype=np.float32, mode=mode,
+            shape=(self.capacity, dim)
+        )
+
+    def __len__(self):
+        return len(self.rows)
+
+    def key(self, text):
+        return embedding_key(text, self.model_name)
+
+    def get(self, keys):
+        """
+        Returns {key: vector} for the keys already stored and marks
+        them as recently used. Recency is only kept in memory; it reaches
+        index.json with the next flush after a put.
+        """
+        found = {}
+        with self.lock:
+            for k in keys:
+                row = self.rows.get(k)
+                if row is None:
+                    continue
+                self.rows.move_to_end(k)
+                found[k] = np.array(self.vectors[row])
+        return found
+
+    def put(self, keys, vectors):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        with self.lock:
+            if self.vectors is None:
+                self._open_vectors(vectors.shape[1])
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(
+                    f"Expected {self.dim}-dim vectors, got {vectors.shape[1]}"
+                )
+
+            for k, vec in zip(keys, vectors):
+                if k in self.rows:
+                    row = self.rows[k]
+                    self.rows.move_to_end(k)
+                elif len(self.rows) < self.capacity:
+                    row = len(self.rows)
+                    self.rows[k] = row
+                else:
+                    _, row = self.rows.popitem(last=False)
+                    self.rows[k] = row
+                self.vectors[row] = vec
+            self.dirty = True
+
+    def flush(self):
+        with self.lock:
+            if not self.dirty or self.vectors is None:
+                return
+            self.vectors.flush()
+
+            meta = {
+                "model": self.model_name,
+                "dim": self.dim,
+                "capacity": self.capacity,
+                "rows": list(self.rows.items())
+            }
+            tmp_path = self.index_path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(meta, f)
+            os.replace(tmp_path, self.index_path)
+            self.dirty = False
+
+
+class QueryCache:
+    """
+    In-memory LRU of normalized query vectors (job descriptions, domain
+    probes), holding at most `capacity` entries.
+    """
+
+    def __init__(self, capacity=1024):
+        self.capacity = capacity
+        self.vectors = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.vectors)
+
+    def get(self, keys):
+        found = {}
+        with self.lock:
+            for k in keys:
+                vec = self.vectors.get(k)
+                if vec is not None:
+                    self.vectors.move_to_end(k)
+                    found[k] = vec
+        return found
+
+    def put(self, keys, vectors):
+        with self.lock:
+            for k, vec in zip(keys, vectors):
+                self.vectors[k] = vec
+                self.vectors.move_to_end(k)
+            while len(self.vectors) > self.capacity:
+                self.vectors.popitem(last=False)
+
+
+_query_caches = {}
+
+
+def query_cache(model_name, capacity=1024):
+    """
+    Returns the process-wide query cache for model_name, shared by every
+    search engine using that model.
+    """
+    with _open_lock:
+        cache = _query_caches.get(model_name)
+        if cache is None:
+            cache = _query_caches[model_name] = QueryCache(capacity)
+    return cache
@@ -0,0 +1,132 @@
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+from backend.extractor import EXTRACTOR_VERSION, is_path, as_buffer
+from backend.section_splitter import SPLITTER_VERSION
+
+# Entries written by a different extractor or splitter are never served
+CACHE_VERSION = f"{EXTRACTOR_VERSION}.{SPLITTER_VERSION}"
+
+
+def file_hash(path, block_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def source_hash(source):
+    """
+    file_hash of a path, or the same digest of in-memory contents.
+    """
+    if is_path(source):
+        return file_hash(source)
+    return hashlib.sha256(as_buffer(source)).hexdigest()
+
+
+class ExtractionCache:
+    """
+    SQLite cache of extracted text and split_sections output, keyed by the
+    SHA-256 of the file contents plus the extraction options (page and
+    size caps). Once the stored text exceeds max_bytes the least recently
+    used entries are evicted.
+    """
+
+    def __init__(self, path, max_bytes=256 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS extractions (
+                file_hash TEXT NOT NULL,
+                options TEXT NOT NULL,
+                version TEXT NOT NULL,
+                text TEXT NOT NULL,
+                sections TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (file_hash, options)
+            )
+        """)
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS extractions_last_used ON extractions (last_used)"
+        )
+        self.conn.commit()
+
+    def get(self, file_hash, options=""):
+        """
+        Returns (text, sections) or None if the file has not been seen
+        with these options by the current parser version.
+        """
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT version, text, sections FROM extractions "
+                "WHERE file_hash = ? AND options = ?",
+                (file_hash, options)
+            ).fetchone()
+            if row is None:
+                return None
+
+            version, text, sections = row
+            if version != CACHE_VERSION:
+                self.conn.execute(
+                    "DELETE FROM extractions WHERE file_hash = ? AND options = ?",
+                    (file_hash, options)
+                )
+                self.conn.commit()
+                return None
+
+            self.conn.execute(
+                "UPDATE extractions SET last_used = ? WHERE file_hash = ? AND options = ?",
+                (time.time(), file_hash, options)
+            )
+            self.conn.commit()
+        return text, json.loads(sections)
+
+    def put(self, file_hash, text, sections, options=""):
+        size = len(text.encode("utf-8"))
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO extractions "
+                "(file_hash, options, version, text, sections, size, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (file_hash, options, CACHE_VERSION, text,
+                 json.dumps(sections), size, time.time())
+            )
+            self._evict()
+            self.conn.commit()
+
+    def _evict(self):
+        total = self.conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM extractions"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        # Oldest first until the cache fits again
+        rows = self.conn.execute(
+            "SELECT file_hash, options, size FROM extractions ORDER BY last_used"
+        )
+        doomed = []
+        for key_hash, options, size in rows:
+            if total <= self.max_bytes:
+                break
+            doomed.append((key_hash, options))
+            total -= size
+        self.conn.executemany(
+            "DELETE FROM extractions WHERE file_hash = ? AND options = ?", doomed
+        )
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM extractions").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
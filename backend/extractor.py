@@ -1,27 +1,144 @@
+import io
 import os
-from docx import Document
-import pdfplumber
-
-def extract_text(file_path):
-    if file_path.endswith(".pdf"):
-        return extract_pdf(file_path)
-    elif file_path.endswith(".docx"):
-        return extract_docx(file_path)
-    elif file_path.endswith(".txt"):
-        return extract_txt(file_path)
+
+from backend.instrumentation import instrument
+
+# pdfplumber and python-docx are imported where a file of their format is
+# opened, so scoring .txt files or importing this module stays cheap
+
+# Bump whenever extracted text changes; it invalidates cached extractions
+EXTRACTOR_VERSION = 2
+
+
+def is_path(source):
+    return isinstance(source, (str, os.PathLike))
+
+
+def as_buffer(source):
+    """
+    memoryview over in-memory file contents: bytes, bytearray, memoryview
+    or a binary file object (BytesIO and Streamlit uploads are viewed in
+    place, other objects are read).
+    """
+    if hasattr(source, "getbuffer"):
+        return source.getbuffer()
+    if hasattr(source, "read"):
+        return memoryview(source.read())
+    return memoryview(source)
+
+
+def sniff_format(data):
+    """
+    "pdf", "docx" or "txt", from the first bytes of the contents.
+    """
+    head = bytes(data[:4])
+    if head == b"%PDF":
+        return "pdf"
+    if head == b"PK\x03\x04":
+        return "docx"
+    return "txt"
+
+
+def _path_format(path):
+    ext = os.path.splitext(os.fspath(path))[1].lower()
+    if ext in (".pdf", ".docx", ".txt"):
+        return ext[1:]
+    with open(path, "rb") as f:
+        return sniff_format(f.read(4))
+
+
+def _source_bytes(args, kwargs, result):
+    source = args[0]
+    size = os.path.getsize(source) if is_path(source) else source.nbytes
+    return {"bytes": size, "chars": len(result)}
+
+
+def extract_text(source, max_pages=None, max_bytes=None):
+    # A file object can only be read once, so it is turned into a buffer
+    # here and the same buffer is parsed and measured
+    if not is_path(source):
+        source = as_buffer(source)
+    return _extract_text(source, max_pages, max_bytes)
+
+
+@instrument("extract_text", _source_bytes)
+def _extract_text(source, max_pages, max_bytes):
+    return "".join(iter_text(source, max_pages=max_pages, max_bytes=max_bytes))
+
+
+def iter_text(source, max_pages=None, max_bytes=None):
+    """
+    Yields the text of a file in chunks as it is extracted: one chunk per
+    page for PDFs, the whole text otherwise. max_pages and max_bytes
+    (UTF-8 size of the text) cap how much of a PDF is read.
+
+    `source` is a path, or the file contents (see as_buffer), which are
+    parsed in memory with their format sniffed from the first bytes.
+    Paths are dispatched on their extension, falling back to sniffing.
+    """
+    if is_path(source):
+        fmt = _path_format(source)
+    else:
+        source = as_buffer(source)
+        fmt = sniff_format(source)
+
+    if fmt == "pdf":
+        yield from iter_pdf_pages(source, max_pages, max_bytes)
+    elif fmt == "docx":
+        yield extract_docx(source)
     else:
-        return ""
+        yield extract_txt(source)
 
-def extract_txt(path):
-    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+
+def _open(source):
+    # pdfplumber and python-docx take a path or a seekable file object
+    return source if is_path(source) else io.BytesIO(source)
+
+
+def extract_txt(source):
+    if not is_path(source):
+        return str(source, "utf-8", "ignore")
+    with open(source, "r", encoding="utf-8", errors="ignore") as f:
         return f.read()
-def extract_pdf(path):
-    text = ""
-    with pdfplumber.open(path) as pdf:
-        for page in pdf.pages:
-            text += page.extract_text() or ""
-    return text
-
-def extract_docx(path):
-    doc = Document(path)
+
+def extract_pdf(path, max_pages=None, max_bytes=None):
+    return "".join(iter_pdf_pages(path, max_pages, max_bytes))
+
+
+def _sequential_pages(source, max_pages):
+    import pdfplumber
+
+    with pdfplumber.open(_open(source)) as pdf:
+        for page in pdf.pages[:max_pages]:
+            text = page.extract_text() or ""
+            # Drop the parsed layout so memory stays flat on long files
+            page.close()
+            yield text
+
+
+def iter_pdf_pages(source, max_pages=None, max_bytes=None):
+    """
+    Yields the text of each page in order. Extraction stops after
+    max_pages pages or once max_bytes of text have been produced, the last
+    page truncated.
+    """
+    pages = _sequential_pages(source, max_pages)
+
+    remaining = max_bytes
+    try:
+        for text in pages:
+            if remaining is not None:
+                data = text.encode("utf-8")
+                if len(data) >= remaining:
+                    yield data[:remaining].decode("utf-8", errors="ignore")
+                    return
+                remaining -= len(data)
+            yield text
+    finally:
+        pages.close()
+
+def extract_docx(source):
+    from docx import Document
+
+    doc = Document(_open(source))
     return "\n".join(p.text for p in doc.paragraphs)
@@ -0,0 +1,266 @@
+import os
+import time
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+
+from backend.extractor import extract_text, iter_text, as_buffer
+from backend.section_splitter import split_sections, split_sections_stream
+from backend.extraction_cache import source_hash
+from backend.instrumentation import count, record
+from backend.scorer import score_resume
+
+
+# A source is a file path or an in-memory upload (name, contents), where
+# contents is anything extractor.as_buffer accepts. Uploads are parsed
+# straight from memory and their results have "path": None.
+
+def source_name(source):
+    return os.path.basename(source[0] if isinstance(source, tuple) else source)
+
+
+def _contents(source):
+    return source[1] if isinstance(source, tuple) else source
+
+
+def _path(source):
+    return None if isinstance(source, tuple) else source
+
+
+def _prepared(source):
+    # File objects are read once, here, so hashing and parsing share the bytes
+    return (source[0], as_buffer(source[1])) if isinstance(source, tuple) else source
+
+
+def _portable(source):
+    # memoryviews cannot be pickled to a worker process
+    if isinstance(source, tuple) and not isinstance(source[1], bytes):
+        return source[0], bytes(source[1])
+    return source
+
+
+def process_file(source, max_pages=None, max_bytes=None, keep_text=False):
+    chunks = iter_text(_contents(source), max_pages=max_pages, max_bytes=max_bytes)
+
+    pages = []
+    if keep_text:
+        chunks = _tee(chunks, pages)
+
+    # Sections are built page by page while the PDF is still being read
+    result = _scored(source, split_sections_stream(chunks))
+    if keep_text:
+        result["raw_text"] = "".join(pages)
+    return result
+
+
+def _scored(source, sections):
+    return {
+        "resume": source_name(source),
+        "path": _path(source),
+        "score": score_resume(sections),
+        "sections": sections
+    }
+
+
+def _tee(chunks, into):
+    for chunk in chunks:
+        into.append(chunk)
+        yield chunk
+
+
+def cache_options(max_pages=None, max_bytes=None):
+    return f"pages={max_pages};bytes={max_bytes}"
+
+
+def load_sections(source, cache=None, max_pages=None, max_bytes=None):
+    """
+    Returns (text, sections) for one file or upload, served from the
+    extraction cache when the same contents were parsed before.
+    """
+    contents = _contents(_prepared(source))
+    if cache is None:
+        text = extract_text(contents, max_pages=max_pages, max_bytes=max_bytes)
+        return text, split_sections(text)
+
+    digest = source_hash(contents)
+    options = cache_options(max_pages, max_bytes)
+    hit = cache.get(digest, options)
+    if hit is not None:
+        return hit
+
+    text = extract_text(contents, max_pages=max_pages, max_bytes=max_bytes)
+    sections = split_sections(text)
+    cache.put(digest, text, sections, options)
+    return text, sections
+
+
+def _failed(source, error):
+    return {
+        "resume": source_name(source),
+        "path": _path(source),
+        "error": error
+    }
+
+
+def _run_inline(paths, process):
+    for path in paths:
+        started = time.perf_counter()
+        try:
+            result = process(path)
+        except Exception as e:
+            result = _failed(path, f"{type(e).__name__}: {e}")
+        record("ingest.file", started, time.perf_counter() - started)
+        yield path, result
+
+
+def _kill_pool(executor):
+    # There is no public way to stop a stuck worker before Python 3.14
+    if hasattr(executor, "terminate_workers"):
+        executor.terminate_workers()
+        return
+    for proc in list((executor._processes or {}).values()):
+        proc.terminate()
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def ingest_files(paths, workers=None, timeout=None, on_progress=None,
+                 max_pages=None, max_bytes=None, cache=None):
+    """
+    Extracts, splits and scores files on a process pool and yields one
+    result per file in completion order:
+
+        {"resume": "resume_1.txt", "path": ..., "score": 75, "sections": {...}}
+
+    `paths` may mix file paths and in-memory uploads (name, contents).
+    A file that raises, times out or crashes its worker yields
+    {"resume", "path", "error"} instead and the rest of the batch carries on.
+    `timeout` is in seconds per file. on_progress(done, total, result) is
+    called after every file. max_pages/max_bytes cap how much of each PDF
+    is read. With an ExtractionCache, files parsed before are served from
+    it (first) and only the rest reach the pool.
+    """
+    paths = [_prepared(p) for p in paths]
+    total = len(paths)
+    done = 0
+    options = cache_options(max_pages, max_bytes)
+
+    todo = []
+    hashes = {}  # id(source) -> digest of its contents
+    for path in paths:
+        if cache is None:
+            todo.append(path)
+            continue
+
+        try:
+            digest = source_hash(_contents(path))
+        except OSError as e:
+            result = _failed(path, f"{type(e).__name__}: {e}")
+        else:
+            hit = cache.get(digest, options)
+            count("extraction_cache.hits" if hit else "extraction_cache.misses")
+            if hit is None:
+                hashes[id(path)] = digest
+                todo.append(path)
+                continue
+            result = _scored(path, hit[1])
+
+        done += 1
+        if on_progress:
+            on_progress(done, total, result)
+        yield result
+
+    process = partial(
+        process_file, max_pages=max_pages, max_bytes=max_bytes,
+        keep_text=cache is not None
+    )
+
+    for path, result in _run_pool(todo, workers, timeout, process):
+        if "raw_text" in result:
+            cache.put(hashes[id(path)], result.pop("raw_text"),
+                      result["sections"], options)
+
+        done += 1
+        if on_progress:
+            on_progress(done, total, result)
+        yield result
+
+
+def _run_pool(paths, workers, timeout, process):
+    # Yields (source, result) so the caller can match results to its inputs
+    if workers is None:
+        workers = min(os.cpu_count() or 1, len(paths)) or 1
+
+    if workers <= 1:
+        yield from _run_inline(paths, process)
+        return
+
+    pending = list(reversed(paths))
+    suspects = []
+    running = {}  # future -> (path, started_at)
+    executor = ProcessPoolExecutor(max_workers=workers)
+
+    try:
+        while pending or suspects or running:
+            if suspects:
+                # Files caught in a crashed pool are retried one at a time
+                # so only the file that kills its worker is reported
+                if not running:
+                    path = suspects.pop()
+                    running[executor.submit(process, _portable(path))] = (path, time.perf_counter())
+            else:
+                # Keep at most one file per worker in flight so the timeout
+                # measures parsing time rather than time spent queued
+                while pending and len(running) < workers:
+                    path = pending.pop()
+                    running[executor.submit(process, _portable(path))] = (path, time.perf_counter())
+
+            isolated = len(running) == 1
+            finished, _ = wait(
+                running, timeout=1.0 if timeout else None, return_when=FIRST_COMPLETED
+            )
+
+            results = []
+            restart = False
+
+            for future in finished:
+                path, started = running.pop(future)
+                record("ingest.file", started, time.perf_counter() - started)
+                try:
+                    results.append((path, future.result()))
+                except BrokenProcessPool:
+                    restart = True
+                    if isolated:
+                        results.append((path, _failed(path, "Worker process crashed")))
+                    else:
+                        suspects.append(path)
+                except Exception as e:
+                    results.append((path, _failed(path, f"{type(e).__name__}: {e}")))
+
+            if timeout:
+                now = time.perf_counter()
+                for future, (path, started) in list(running.items()):
+                    if now - started > timeout:
+                        del running[future]
+                        results.append((path, _failed(path, f"Timed out after {timeout}s")))
+                        restart = True
+
+            if restart:
+                # Whatever was still running on the old pool goes back in
+                # the queue untouched
+                for path, _ in running.values():
+                    (suspects if suspects else pending).append(path)
+                running.clear()
+                _kill_pool(executor)
+                executor = ProcessPoolExecutor(max_workers=workers)
+
+            yield from results
+    finally:
+        _kill_pool(executor)
+
+
+def list_resume_files(resume_dir):
+    return [
+        os.path.join(resume_dir, f)
+        for f in sorted(os.listdir(resume_dir))
+        if os.path.isfile(os.path.join(resume_dir, f))
+    ]
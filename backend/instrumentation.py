@@ -0,0 +1,166 @@
+"""
+Per-stage timings and counters for the backend.
+
+Off unless RESUME_PROFILE=1 is set before the backend is imported; when
+off, @instrument returns the function untouched and count()/record() are
+a single flag check. Set RESUME_TRACE_FILE=path as well to write a
+Chrome trace (chrome://tracing, Perfetto) when the process exits.
+
+Worker processes of a batch ingestion keep their own records; the parent
+records each file's wall time as "ingest.file".
+"""
+import os
+import json
+import time
+import atexit
+import threading
+import functools
+
+ENABLED = os.environ.get("RESUME_PROFILE", "") not in ("", "0")
+TRACE_FILE = os.environ.get("RESUME_TRACE_FILE")
+
+# Upper bounds (ms) of the histogram buckets; the last bucket is open
+BUCKETS_MS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+MAX_TRACE_EVENTS = 200000
+
+
+def _percentile(stage, p):
+    # Upper bound of the histogram bucket holding the p-th percentile
+    target = stage["calls"] * p / 100
+    seen = 0
+    for i, n in enumerate(stage["histogram"]):
+        seen += n
+        if n and seen >= target:
+            return BUCKETS_MS[i] if i < len(BUCKETS_MS) else round(stage["max_ms"], 1)
+    return round(stage["max_ms"], 1)
+
+
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.origin = time.perf_counter()
+        self.stages = {}
+        self.counters = {}
+        self.events = []
+
+    def record(self, stage, start, duration, **counters):
+        ms = duration * 1000
+        bucket = len(BUCKETS_MS)
+        for i, bound in enumerate(BUCKETS_MS):
+            if ms <= bound:
+                bucket = i
+                break
+
+        with self.lock:
+            s = self.stages.get(stage)
+            if s is None:
+                s = self.stages[stage] = {
+                    "calls": 0, "total_ms": 0.0, "max_ms": 0.0,
+                    "histogram": [0] * (len(BUCKETS_MS) + 1), "counters": {}
+                }
+            s["calls"] += 1
+            s["total_ms"] += ms
+            s["max_ms"] = max(s["max_ms"], ms)
+            s["histogram"][bucket] += 1
+            for name, value in counters.items():
+                s["counters"][name] = s["counters"].get(name, 0) + value
+
+            if len(self.events) < MAX_TRACE_EVENTS:
+                self.events.append({
+                    "name": stage,
+                    "ph": "X",
+                    "ts": round((start - self.origin) * 1e6, 1),
+                    "dur": round(duration * 1e6, 1),
+                    "pid": os.getpid(),
+                    "tid": threading.get_ident(),
+                    "args": counters
+                })
+
+    def count(self, name, value=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def snapshot(self):
+        with self.lock:
+            stages = {k: dict(v, counters=dict(v["counters"])) for k, v in self.stages.items()}
+            counters = dict(self.counters)
+        for s in stages.values():
+            s["mean_ms"] = s["total_ms"] / s["calls"]
+            s["p50_ms"] = _percentile(s, 50)
+            s["p95_ms"] = _percentile(s, 95)
+        return {"stages": stages, "counters": counters}
+
+    def report(self):
+        snap = self.snapshot()
+        lines = [
+            f"{'stage':<32}{'calls':>8}{'total ms':>12}{'mean ms':>10}"
+            f"{'p50 ≤ms':>10}{'p95 ≤ms':>10}{'max ms':>10}  counters"
+        ]
+        stages = sorted(snap["stages"].items(), key=lambda kv: -kv[1]["total_ms"])
+        for name, s in stages:
+            extra = ", ".join(f"{k}={v}" for k, v in s["counters"].items())
+            lines.append(
+                f"{name:<32}{s['calls']:>8}{s['total_ms']:>12.1f}{s['mean_ms']:>10.2f}"
+                f"{s['p50_ms']:>10}{s['p95_ms']:>10}{s['max_ms']:>10.1f}  {extra}"
+            )
+        for name, value in sorted(snap["counters"].items()):
+            lines.append(f"{name:<32}{value:>8}")
+        return "\n".join(lines)
+
+    def dump_chrome_trace(self, path):
+        with self.lock:
+            events = list(self.events)
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+RECORDER = Recorder()
+
+
+def instrument(stage, measure=None):
+    """
+    Decorator timing every call under `stage`. measure(args, kwargs,
+    result) may return counters to add, e.g. {"bytes": 1024}.
+    """
+    def decorate(fn):
+        if not ENABLED:
+            return fn
+
+        @functools.wraps(fn)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            result = fn(*args, **kwargs)
+            duration = time.perf_counter() - start
+            counters = measure(args, kwargs, result) if measure else {}
+            RECORDER.record(stage, start, duration, **counters)
+            return result
+
+        return timed
+
+    return decorate
+
+
+def record(stage, start, duration, **counters):
+    if ENABLED:
+        RECORDER.record(stage, start, duration, **counters)
+
+
+def count(name, value=1):
+    if ENABLED:
+        RECORDER.count(name, value)
+
+
+def report():
+    return RECORDER.report()
+
+
+def dump_chrome_trace(path):
+    RECORDER.dump_chrome_trace(path)
+
+
+if ENABLED and TRACE_FILE:
+    atexit.register(dump_chrome_trace, TRACE_FILE)
@@ -0,0 +1,299 @@
+import os
+import json
+import time
+import uuid
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.ingest import ingest_files
+from backend.extractor import as_buffer
+from backend.extraction_cache import ExtractionCache
+from backend.resume_store import ResumeStore
+from backend.dedup import collapse_duplicates
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+# Finished jobs kept in memory (their directories stay on disk until pruned)
+MAX_FINISHED_JOBS = 100
+
+# Old job directories are pruned from submit() at most this often (seconds)
+PRUNE_INTERVAL = 3600
+
+# Store, search index and domain groups are shared by every job; only one
+# job updates them at a time while extraction runs concurrently
+POOL_LOCK = threading.Lock()
+
+
+class Job:
+    """
+    One submitted batch. Its result.json (and, unless persisting was
+    turned off, a copy of its uploads) lives in `dir`; progress is
+    readable from any thread through snapshot().
+    """
+
+    def __init__(self, job_id, job_dir, total):
+        self.id = job_id
+        self.dir = job_dir
+        self.status = QUEUED
+        self.stage = "queued"
+        self.done = 0
+        self.total = total
+        self.results = []
+        self.failed = []
+        self.error = None
+        self.created = time.time()
+        self.finished = None
+        self.lock = threading.Lock()
+        self.changed = threading.Condition(self.lock)
+
+    @property
+    def input_dir(self):
+        return os.path.join(self.dir, "resumes")
+
+    @property
+    def result_path(self):
+        return os.path.join(self.dir, "result.json")
+
+    def update(self, **fields):
+        with self.lock:
+            for name, value in fields.items():
+                setattr(self, name, value)
+            self.changed.notify_all()
+
+    def progress(self, done, total, result):
+        with self.lock:
+            self.done = done
+            self.total = total
+            if "error" in result:
+                self.failed.append({"resume": result["resume"], "error": result["error"]})
+            else:
+                self.results.append(result)
+            self.stage = f"processed {result['resume']}"
+            self.changed.notify_all()
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "id": self.id,
+                "status": self.status,
+                "stage": self.stage,
+                "done": self.done,
+                "total": self.total,
+                "failed": list(self.failed),
+                "error": self.error,
+                "created": self.created,
+                "finished": self.finished
+            }
+
+    def wait(self, timeout=None, since=None):
+        """
+        Blocks until the job finishes, or with since=snapshot until
+        anything changes. Returns the latest snapshot.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.lock:
+            while self.status not in (DONE, FAILED):
+                if since is not None and (self.status, self.done, self.stage) != (
+                    since["status"], since["done"], since["stage"]
+                ):
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self.changed.wait(remaining)
+        return self.snapshot()
+
+
+class JobQueue:
+    """
+    Runs submitted batches on a small thread pool. Uploads are parsed
+    from memory; each job gets its own directory under root_dir for its
+    result.json and the optional copy of its uploads, so concurrent
+    sessions never write into each other's files.
+
+    run(job, sources, **options) does the work on ingest sources
+    ((name, contents) pairs); it reports progress through
+    job.progress()/job.update() and returns the JSON-able job result.
+    """
+
+    def __init__(self, root_dir, run, workers=2):
+        self.root_dir = root_dir
+        self.run = run
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self.writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="job-writer")
+        self.last_pruned = 0
+        os.makedirs(root_dir, exist_ok=True)
+
+    def submit(self, files, persist=True, **options):
+        """
+        files is [(file_name, contents), ...] with contents as bytes, a
+        memoryview (e.g. UploadedFile.getbuffer()) or a file object.
+        Returns the job id at once. With persist=True a copy of the uploads
+        is written to the job directory in the background; parsing does
+        not wait for it. Directories of old jobs are pruned in the
+        background too, at most once per PRUNE_INTERVAL.
+        """
+        job_id = uuid.uuid4().hex[:12]
+        job = Job(job_id, os.path.join(self.root_dir, job_id), len(files))
+        os.makedirs(job.dir)
+
+        sources = [(os.path.basename(name), as_buffer(data)) for name, data in files]
+        if persist:
+            self.writer.submit(save_uploads, job.input_dir, sources)
+
+        with self.lock:
+            self.jobs[job_id] = job
+            self._forget_finished()
+            prune = time.time() - self.last_pruned >= PRUNE_INTERVAL
+            if prune:
+                self.last_pruned = time.time()
+        if prune:
+            self.writer.submit(self.prune)
+        self.executor.submit(self._execute, job, sources, options)
+        return job_id
+
+    def _execute(self, job, sources, options):
+        job.update(status=RUNNING, stage="extracting")
+        try:
+            result = self.run(job, sources, **options)
+        except Exception as e:
+            job.update(status=FAILED, error=f"{type(e).__name__}: {e}",
+                       stage="failed", finished=time.time())
+            return
+
+        tmp = job.result_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(result, f)
+        os.replace(tmp, job.result_path)
+        job.update(status=DONE, stage="done", finished=time.time())
+
+    def _forget_finished(self):
+        finished = [j for j in self.jobs.values() if j.status in (DONE, FAILED)]
+        finished.sort(key=lambda j: j.finished)
+        for job in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self.jobs[job.id]
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def result(self, job_id):
+        """
+        The saved result of a finished job, also after a restart.
+        """
+        path = os.path.join(self.root_dir, os.path.basename(job_id), "result.json")
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def prune(self, max_age=7 * 24 * 3600):
+        """
+        Deletes job directories older than max_age seconds.
+        """
+        cutoff = time.time() - max_age
+        with self.lock:
+            active = {j.id for j in self.jobs.values() if j.status in (QUEUED, RUNNING)}
+        for name in os.listdir(self.root_dir):
+            path = os.path.join(self.root_dir, name)
+            if name not in active and os.path.getmtime(path) < cutoff:
+                shutil.rmtree(path, ignore_errors=True)
+
+
+def save_uploads(directory, sources):
+    os.makedirs(directory, exist_ok=True)
+    for name, data in sources:
+        with open(os.path.join(directory, name), "wb") as f:
+            f.write(data)
+
+
+_queues = {}
+_queues_lock = threading.Lock()
+
+
+def get_queue(root_dir, run, workers=2):
+    """
+    Returns the process-wide queue for root_dir, so every Streamlit
+    session submits to and polls the same jobs.
+    """
+    key = os.path.abspath(root_dir)
+    with _queues_lock:
+        queue = _queues.get(key)
+        if queue is None:
+            queue = _queues[key] = JobQueue(root_dir, run, workers)
+    return queue
+
+
+def analyze_batch(job, sources, store_path, index_dir, embedding_cache_dir,
+                  extraction_cache_path=None, timeout=60,
+                  max_pages=None, domain_queries=None, threshold=0.22):
+    """
+    Job body for the main page: extracts and scores the batch, drops
+    copies of resumes already in the pool (or earlier in the batch),
+    merges the rest into the shared ResumeStore, syncs the search index
+    and reclassifies the pool. Returns the batch's own ranking, failures
+    and duplicates.
+    """
+    from backend.semantic_search import ResumeSemanticSearch, DOMAIN_QUERIES
+
+    cache = ExtractionCache(extraction_cache_path) if extraction_cache_path else None
+    for _ in ingest_files(sources, timeout=timeout, max_pages=max_pages,
+                          cache=cache, on_progress=job.progress):
+        pass
+
+    results = [
+        {"resume": r["resume"], "score": r["score"], "sections": r["sections"]}
+        for r in job.results
+    ]
+    if not results:
+        raise ValueError("none of the uploaded resumes could be processed")
+
+    job.update(stage="waiting for the pool")
+    with POOL_LOCK:
+        # The pool is shared by every session and process, so a batch only
+        # ever adds to it
+        store = pool_store(store_path)
+
+        job.update(stage="removing duplicates")
+        results, duplicates = collapse_duplicates(results, store.duplicate_index())
+        # A name listed twice is reported against itself and stays pooled
+        store.remove(d["resume"] for d in duplicates if d["resume"] != d["duplicate_of"])
+        store.upsert(results)
+
+        job.update(stage="indexing")
+        search_engine = ResumeSemanticSearch(cache_dir=embedding_cache_dir)
+        search_engine.load_index(index_dir)
+        if search_engine.sync(store.results()):
+            search_engine.save_index(index_dir)
+
+        job.update(stage="classifying")
+        store.set_domains(search_engine.classify_by_domain(
+            domain_queries or DOMAIN_QUERIES, threshold=threshold
+        ))
+
+    ranking = sorted(((r["resume"], r["score"]) for r in results),
+                     key=lambda x: x[1], reverse=True)
+    return {"ranking": ranking, "failed": job.snapshot()["failed"], "duplicates": duplicates}
+
+
+_pool_stores = {}
+
+
+def pool_store(path):
+    """
+    Returns the process-wide ResumeStore for path, shared by the jobs and
+    every Streamlit session: the pool is opened once per process and its
+    duplicate index is read from SQLite once, then kept up to date.
+    """
+    key = os.path.abspath(path)
+    with _queues_lock:
+        store = _pool_stores.get(key)
+        if store is None:
+            store = _pool_stores[key] = ResumeStore(path)
+    return store
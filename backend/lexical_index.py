@@ -0,0 +1,219 @@
+import os
+import re
+import json
+import hashlib
+from collections import Counter
+
+import numpy as np
+
+from backend.vector_index import top_k_indices
+
+# Keeps tech names such as c++, c#, node.js and .net in one piece
+TOKEN_PATTERN = re.compile(r"[a-z0-9+#]+(?:\.[a-z0-9]+)*|\.[a-z0-9]+")
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it of on or that the "
+    "to with was were will i we you our your my me this using used use".split()
+)
+
+INDEXED_SECTIONS = ("skills", "projects", "experience", "achievements", "education", "extras")
+
+
+def tokenize(text):
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOPWORDS]
+
+
+def _document(sections):
+    return " ".join(sections.get(name) or "" for name in INDEXED_SECTIONS)
+
+
+def pool_signature(resume_data):
+    """
+    Hash of the resume names and indexed text, used to tell whether a
+    saved index still matches the pool.
+    """
+    h = hashlib.sha256()
+    for r in resume_data:
+        h.update((r.get("Resume") or r.get("resume")).encode("utf-8"))
+        h.update(b"\0")
+        h.update(_document(r["sections"]).encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class BM25Index:
+    """
+    Inverted index over resume sections with BM25 ranking.
+
+    Postings are stored CSR-style: term t owns doc_ids[indptr[t]:indptr[t + 1]]
+    with the matching precomputed BM25 impacts in weights, so a query is
+    a few array slices and one np.bincount.
+    """
+
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.resume_ids = []
+        self.positions = {}
+        self.vocab = {}
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.doc_ids = np.array([], dtype=np.int32)
+        self.weights = np.array([], dtype=np.float32)
+        self.signature = None
+
+    def __len__(self):
+        return len(self.resume_ids)
+
+    def build(self, resume_data):
+        resume_data = list(resume_data)
+        self.resume_ids = [r.get("Resume") or r.get("resume") for r in resume_data]
+        self.positions = {r: i for i, r in enumerate(self.resume_ids)}
+        self.signature = pool_signature(resume_data)
+
+        vocab = {}
+        term_ids, doc_ids, tfs = [], [], []
+        lengths = np.zeros(len(resume_data), dtype=np.float32)
+        for doc, r in enumerate(resume_data):
+            tokens = tokenize(_document(r["sections"]))
+            lengths[doc] = len(tokens)
+            for term, tf in Counter(tokens).items():
+                term_ids.append(vocab.setdefault(term, len(vocab)))
+                doc_ids.append(doc)
+                tfs.append(tf)
+
+        term_ids = np.array(term_ids, dtype=np.int64)
+        order = np.argsort(term_ids, kind="stable")
+        term_ids = term_ids[order]
+        doc_ids = np.array(doc_ids, dtype=np.int32)[order]
+        tfs = np.array(tfs, dtype=np.float32)[order]
+
+        n = max(len(resume_data), 1)
+        df = np.bincount(term_ids, minlength=len(vocab))
+        idf = np.log(1 + (n - df + 0.5) / (df + 0.5)).astype(np.float32)
+        avg_len = lengths.mean() if len(lengths) else 1.0
+        norm = self.k1 * (1 - self.b + self.b * lengths[doc_ids] / max(avg_len, 1.0))
+
+        self.vocab = vocab
+        self.indptr = np.concatenate(([0], np.cumsum(df))).astype(np.int64)
+        self.doc_ids = doc_ids
+        self.weights = (idf[term_ids] * tfs * (self.k1 + 1) / (tfs + norm)).astype(np.float32)
+
+    def scores(self, query):
+        """
+        BM25 score of every resume for query (zero when no term matches).
+        """
+        slices = []
+        for term in set(tokenize(query)):
+            t = self.vocab.get(term)
+            if t is not None:
+                slices.append(slice(self.indptr[t], self.indptr[t + 1]))
+        if not slices:
+            return np.zeros(len(self.resume_ids), dtype=np.float32)
+
+        docs = np.concatenate([self.doc_ids[s] for s in slices])
+        impacts = np.concatenate([self.weights[s] for s in slices])
+        return np.bincount(docs, weights=impacts, minlength=len(self.resume_ids)).astype(np.float32)
+
+    def search(self, query, top_k=10):
+        """
+        [(resume_id, bm25), ...] for resumes matching at least one term.
+        """
+        scores = self.scores(query)
+        idx = top_k_indices(scores, top_k)
+        return [(self.resume_ids[i], float(scores[i])) for i in idx if scores[i] > 0]
+
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        np.savez(
+            os.path.join(directory, "postings.npz"),
+            indptr=self.indptr, doc_ids=self.doc_ids, weights=self.weights
+        )
+        meta_path = os.path.join(directory, "meta.json")
+        with open(meta_path + ".tmp", "w") as f:
+            json.dump({
+                "params": [self.k1, self.b],
+                "signature": self.signature,
+                "resume_ids": self.resume_ids,
+                "vocab": self.vocab
+            }, f)
+        os.replace(meta_path + ".tmp", meta_path)
+
+    def load(self, directory):
+        meta_path = os.path.join(directory, "meta.json")
+        postings_path = os.path.join(directory, "postings.npz")
+        if not os.path.exists(meta_path) or not os.path.exists(postings_path):
+            return False
+
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta.get("params") != [self.k1, self.b]:
+            return False
+
+        with np.load(postings_path) as data:
+            self.indptr = data["indptr"]
+            self.doc_ids = data["doc_ids"]
+            self.weights = data["weights"]
+        self.signature = meta["signature"]
+        self.resume_ids = meta["resume_ids"]
+        self.vocab = meta["vocab"]
+        self.positions = {r: i for i, r in enumerate(self.resume_ids)}
+        return True
+
+    def sync(self, resume_data):
+        """
+        Rebuilds when resume_data differs from what was indexed. Returns
+        True if it did.
+        """
+        resume_data = list(resume_data)
+        if self.signature == pool_signature(resume_data):
+            return False
+        self.build(resume_data)
+        return True
+
+
+def hybrid_search(engine, lexical, query, top_k=5, depth=100, prefilter=None,
+                  rrf_k=60, dense_weight=1.0, lexical_weight=1.0, allowed=None):
+    """
+    Fuses the BM25 and embedding rankings (their best `depth` each) with
+    weighted reciprocal rank fusion.
+
+    With prefilter=N only the N best BM25 matches are scored by the
+    embedding model, which skips dense scoring for the rest of the pool.
+    When fewer than top_k resumes match any query term the whole pool is
+    scored instead. `allowed` (a set of resume ids, e.g. from a skill
+    filter) limits both rankings to those resumes.
+
+    Returns [(resume_id, fused, similarity, bm25), ...], best first.
+    """
+    bm25 = lexical.scores(query)
+    matched = np.flatnonzero(bm25 > 0)
+    matched = matched[np.argsort(-bm25[matched], kind="stable")]
+    lexical_ids = [lexical.resume_ids[i] for i in matched]
+    if allowed is not None:
+        lexical_ids = [r for r in lexical_ids if r in allowed]
+
+    if prefilter and len(lexical_ids) >= top_k:
+        dense = engine.search_among(query, lexical_ids[:prefilter], top_k=depth)
+    elif allowed is not None:
+        dense = engine.search_among(query, [r for r in engine.resume_ids if r in allowed], top_k=depth)
+    else:
+        dense = engine.search(query, top_k=depth)
+
+    fused = {}
+    for weight, ids in ((dense_weight, [r for r, _ in dense]), (lexical_weight, lexical_ids[:depth])):
+        for rank, resume_id in enumerate(ids, start=1):
+            fused[resume_id] = fused.get(resume_id, 0.0) + weight / (rrf_k + rank)
+
+    best = sorted(fused, key=lambda r: -fused[r])[:top_k]
+
+    # Lexical-only hits still show their embedding similarity
+    similarity = dict(dense)
+    missing = [r for r in best if r not in similarity and r in engine.positions]
+    if missing:
+        similarity.update(zip(missing, engine.score_resumes([query], missing)[0].tolist()))
+
+    return [
+        (r, fused[r], similarity.get(r, 0.0),
+         float(bm25[lexical.positions[r]]) if r in lexical.positions else 0.0)
+        for r in best
+    ]
@@ -1,72 +1,162 @@
-from extractor import extract_text
-from section_splitter import split_sections
-from scorer import score_resume
-from utils import normalize_text
 import os
+import sys
+import argparse
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from backend.extractor import extract_text
+from backend.section_splitter import split_sections
+from backend.scorer import score_resume, to_columns, extract_features, rank
+from backend.ingest import ingest_files, list_resume_files
+from backend.extraction_cache import ExtractionCache
+from backend.dedup import collapse_duplicates
+from backend.quick_score import parse_weights
+from backend.utils import normalize_text
+from backend import instrumentation
 
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 RESUME_DIR = os.path.join(BASE_DIR, "resumes")
+EMBEDDING_CACHE_DIR = os.path.join(BASE_DIR, "outputs", "embedding_cache")
+EXTRACTION_CACHE_PATH = os.path.join(BASE_DIR, "outputs", "extraction_cache.db")
+SEARCH_INDEX_DIR = os.path.join(BASE_DIR, "outputs", "search_index")
+STORE_PATH = os.path.join(BASE_DIR, "outputs", "resumes.db")
+WATCH_STATE_PATH = os.path.join(BASE_DIR, "outputs", "watch_state.json")
 
-results = []
 
-for file in os.listdir(RESUME_DIR):
-    path = os.path.join(RESUME_DIR, file)
+def pretty_print_sections(sections):
+    print("\n--- EXTRACTED RESUME DATA ---\n")
+    for section, content in sections.items():
+        if content.strip():
+            print(f"[{section.upper()}]")
+            print(content.strip())
+            print("-" * 40)
 
-    if not os.path.isfile(path):
-        continue
 
+def watch(args):
+    from backend.watcher import DirectoryWatcher, PoolUpdater
+
+    updater = PoolUpdater(
+        STORE_PATH, SEARCH_INDEX_DIR, EMBEDDING_CACHE_DIR, EXTRACTION_CACHE_PATH,
+        workers=args.workers, timeout=args.timeout, max_pages=args.max_pages
+    )
+
+    def on_batch(changed, removed):
+        summary = updater(changed, removed)
+        for r in summary["updated"]:
+            print(f"✅ {r['resume']} → {r['score']}")
+        for r in summary["failed"]:
+            print(f"⚠️  Skipped {r['resume']}: {r['error']}")
+        for d in summary["duplicates"]:
+            print(f"🔁 {d['resume']} duplicates {d['duplicate_of']} ({d['similarity']:.0%} similar)")
+        for name in summary["removed"]:
+            print(f"🗑️  Removed {name}")
+
+        print("\nTOP 5\n")
+        for idx, (name, score) in enumerate(updater.store.ranking()[:5], start=1):
+            print(f"{idx}. {name} → {score}")
+        print()
+        return summary
+
+    watcher = DirectoryWatcher(
+        RESUME_DIR, on_batch, interval=args.interval, debounce=args.debounce,
+        state_path=WATCH_STATE_PATH
+    )
+    print(f"👀 Watching {RESUME_DIR} (Ctrl+C to stop)")
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank and classify resumes")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="extraction processes (default: one per CPU, 1 = no pool)")
+    parser.add_argument("--timeout", type=float, default=60,
+                        help="seconds allowed per file")
+    parser.add_argument("--max-pages", type=int, default=None,
+                        help="only read the first N pages of each PDF")
+    parser.add_argument("--weights", type=parse_weights, default=None,
+                        help="override criterion weights, e.g. Skills=30,Projects=10")
+    parser.add_argument("--watch", action="store_true",
+                        help="keep running and process resumes as they arrive")
+    parser.add_argument("--interval", type=float, default=2.0,
+                        help="seconds between directory scans in --watch mode")
+    parser.add_argument("--debounce", type=float, default=2.0,
+                        help="seconds a file must stay unchanged before it is parsed")
+    args = parser.parse_args()
+
+    if args.watch:
+        os.makedirs(os.path.dirname(STORE_PATH), exist_ok=True)
+        watch(args)
+        return
+
+    results = []
+    os.makedirs(os.path.dirname(EXTRACTION_CACHE_PATH), exist_ok=True)
+    cache = ExtractionCache(EXTRACTION_CACHE_PATH)
+
+    for r in ingest_files(list_resume_files(RESUME_DIR),
+                          workers=args.workers, timeout=args.timeout,
+                          max_pages=args.max_pages, cache=cache):
+        if "error" in r:
+            print(f"⚠️  Skipped {r['resume']}: {r['error']}")
+            continue
+        results.append(r)
+
+    # Copies and lightly edited re-submissions are ranked and embedded once
+    results, duplicates = collapse_duplicates(results)
+    for d in duplicates:
+        print(f"🔁 Skipped {d['resume']}: duplicates {d['duplicate_of']} ({d['similarity']:.0%} similar)")
+
+    # Ranking
+    if args.weights:
+        features = extract_features(to_columns([r["sections"] for r in results]))
+        ranked = rank([r["resume"] for r in results], features, args.weights)
+    else:
+        ranked = sorted(
+            ((r["resume"], r["score"]) for r in results),
+            key=lambda x: x[1], reverse=True
+        )
+
+    print("\nFINAL RANKING\n")
+    for idx, (name, score) in enumerate(ranked, start=1):
+        print(f"{idx}. {name} → {score}")
+
+    file = "resume_1.txt"
+    path = os.path.join(RESUME_DIR, file)
+    print("\n")
     text = extract_text(path)
     sections = split_sections(text)
     score = score_resume(sections)
+    for a,b in sections.items():
+        sections[a] = sections[a].replace("\n", " ").strip()
+    pretty_print_sections(sections)
 
-    results.append({
-        "resume": file,
-        "score": score,
-        "sections": sections
-    })
-
-
+    from backend.semantic_search import ResumeSemanticSearch, DOMAIN_QUERIES
 
-# Ranking
-ranked = sorted(results, key=lambda x: x["score"], reverse=True)
+    search_engine = ResumeSemanticSearch(cache_dir=EMBEDDING_CACHE_DIR)
+    search_engine.index_resumes(results)
 
-print("\nFINAL RANKING\n")
-for idx, r in enumerate(ranked, start=1):
-    print(f"{idx}. {r['resume']} → {r['score']}")
+    domain_groups = search_engine.classify_by_domain(
+        DOMAIN_QUERIES,
+        threshold=0.22
+    )
 
-file = "resume_1.txt"
-path = os.path.join(RESUME_DIR, file)
-print("\n")
-text = extract_text(path)
-sections = split_sections(text)
-score = score_resume(sections)
-for a,b in sections.items():
-        sections[a] = sections[a].replace("\n", " ").strip()
-def pretty_print_sections(sections):
-    print("\n--- EXTRACTED RESUME DATA ---\n")
-    for section, content in sections.items():
-        if content.strip():
-            print(f"[{section.upper()}]")
-            print(content.strip())
-            print("-" * 40)
-pretty_print_sections(sections)
 
-from semantic_search import ResumeSemanticSearch, DOMAIN_QUERIES
+    print("\n📂 RESUME CLASSIFICATION BY DOMAIN (SEMANTIC)\n")
 
-search_engine = ResumeSemanticSearch()
-search_engine.index_resumes(results)
+    for domain, resumes in domain_groups.items():
+        if resumes:
+            print(domain)
+            for r in resumes:
+                print(r)
+            print()
 
-domain_groups = search_engine.classify_by_domain(
-    DOMAIN_QUERIES,
-    threshold=0.22
-)
+    if instrumentation.ENABLED:
+        print("\n⏱️ STAGE TIMINGS\n")
+        print(instrumentation.report())
 
 
-print("\n📂 RESUME CLASSIFICATION BY DOMAIN (SEMANTIC)\n")
-
-for domain, resumes in domain_groups.items():
-    if resumes:
-        print(domain)
-        for r in resumes:
-            print(r)
-        print()
+if __name__ == "__main__":
+    main()
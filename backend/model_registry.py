@@ -0,0 +1,70 @@
+import threading
+
+WARMUP_TEXTS = [
+    "The candidate has skills in Python, SQL and machine learning",
+    "Web development intern with React and Django projects"
+]
+
+_models = {}
+_registry_lock = threading.Lock()
+
+
+class SharedModel:
+    """
+    Process-wide handle to one encoder.
+
+    The underlying tokenizer is not safe to call from several threads at
+    once, so encode calls are serialized per model.
+    """
+
+    def __init__(self, model_name):
+        # sentence_transformers pulls in torch, transformers and sklearn;
+        # importing it here keeps them out of processes that never encode
+        from sentence_transformers import SentenceTransformer
+
+        self.model_name = model_name
+        self.model = SentenceTransformer(model_name)
+        self.lock = threading.Lock()
+        self.warm = False
+
+    def encode(self, texts, **kwargs):
+        with self.lock:
+            return self.model.encode(texts, **kwargs)
+
+    def warm_up(self):
+        if not self.warm:
+            self.encode(WARMUP_TEXTS, convert_to_numpy=True)
+            self.warm = True
+
+
+def get_model(model_name, warmup=False):
+    """
+    Returns the shared encoder for model_name, loading it on first use.
+    """
+    shared = _models.get(model_name)
+    if shared is None:
+        with _registry_lock:
+            shared = _models.get(model_name)
+            if shared is None:
+                shared = SharedModel(model_name)
+                _models[model_name] = shared
+
+    if warmup:
+        shared.warm_up()
+    return shared
+
+
+def preload(model_name, warmup=True):
+    """
+    Loads (and optionally warms) a model on a background thread so the
+    first semantic query does not pay the load time.
+    """
+    thread = threading.Thread(
+        target=get_model, args=(model_name, warmup), daemon=True
+    )
+    thread.start()
+    return thread
+
+
+def is_loaded(model_name):
+    return model_name in _models
@@ -0,0 +1,88 @@
+"""
+Scores and ranks resumes without the semantic pipeline:
+
+    python -m backend.quick_score resumes/*.txt cv.pdf [--weights Skills=30] [--json]
+
+Only the extractor, section splitter and scorer are imported (no
+embedding model, no store), so it starts in a fraction of a second.
+benchmarks/import_time.py checks that it stays that way.
+"""
+import os
+import sys
+import json
+import argparse
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from backend.scorer import WEIGHTS, to_columns, extract_features, rank
+from backend.ingest import ingest_files, list_resume_files
+
+
+def parse_weights(spec):
+    """
+    "Skills=30,Projects=10" -> {"Skills": 30.0, "Projects": 10.0}
+    """
+    weights = {}
+    for part in filter(None, spec.split(",")):
+        name, _, value = part.partition("=")
+        name = name.strip()
+        if name not in WEIGHTS:
+            raise argparse.ArgumentTypeError(
+                f"unknown criterion {name!r}; choose from {', '.join(WEIGHTS)}"
+            )
+        weights[name] = float(value)
+    return weights
+
+
+def score_files(paths, weights=None, workers=1, timeout=None, max_pages=None):
+    """
+    Extracts and scores files. Returns (ranking, failed): ranking is
+    [(resume, score), ...] best first, failed the ingest errors.
+    """
+    results, failed = [], []
+    for r in ingest_files(paths, workers=workers, timeout=timeout, max_pages=max_pages):
+        (failed if "error" in r else results).append(r)
+    if not results:
+        return [], failed
+
+    features = extract_features(to_columns([r["sections"] for r in results]))
+    return rank([r["resume"] for r in results], features, weights), failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score and rank resumes (no semantic matching)")
+    parser.add_argument("paths", nargs="+", help="resume files or directories of them")
+    parser.add_argument("--weights", type=parse_weights, default=None,
+                        help="override criterion weights, e.g. Skills=30,Projects=10")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="extraction processes (default 1, no pool)")
+    parser.add_argument("--timeout", type=float, default=None, help="seconds allowed per file")
+    parser.add_argument("--max-pages", type=int, default=None,
+                        help="only read the first N pages of each PDF")
+    parser.add_argument("--json", action="store_true", help="print the ranking as JSON")
+    args = parser.parse_args(argv)
+
+    paths = []
+    for path in args.paths:
+        paths.extend(list_resume_files(path) if os.path.isdir(path) else [path])
+
+    ranking, failed = score_files(paths, args.weights, workers=args.workers,
+                                  timeout=args.timeout, max_pages=args.max_pages)
+
+    if args.json:
+        print(json.dumps({
+            "ranking": [{"resume": name, "score": score} for name, score in ranking],
+            "failed": [{"resume": f["resume"], "error": f["error"]} for f in failed]
+        }, indent=2))
+    else:
+        for f in failed:
+            print(f"⚠️  Skipped {f['resume']}: {f['error']}", file=sys.stderr)
+        for idx, (name, score) in enumerate(ranking, start=1):
+            print(f"{idx}. {name} → {score}")
+    return 1 if failed and not ranking else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,323 @@
+import os
+import csv
+import json
+import time
+import sqlite3
+import threading
+
+import numpy as np
+
+from backend.scorer import CRITERIA, to_columns, extract_features
+from backend.dedup import SHINGLE_WORDS, NUM_PERM, DUPLICATE_THRESHOLD, DuplicateIndex, fingerprint, resume_text
+
+
+class ResumeStore:
+    """
+    SQLite store of the analyzed pool: sections, score, raw scoring
+    features and duplicate fingerprint per resume, plus the domain each
+    resume was classified into. Everything is keyed by resume id (the
+    file name), so lookups and updates touch one row instead of rewriting
+    the whole pool.
+
+    Embeddings stay in the search index saved next to it (see
+    ResumeSemanticSearch.save_index), which is keyed the same way.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        # Built on the first duplicate_index() call, then kept in step with
+        # upsert/remove/clear; data_version tells when another connection
+        # changed the pool and it has to be rebuilt
+        self.duplicates = None
+        self.duplicates_version = None
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS resumes (
+                resume_id TEXT PRIMARY KEY,
+                score REAL NOT NULL,
+                sections TEXT NOT NULL,
+                features BLOB NOT NULL,
+                updated REAL NOT NULL,
+                digest TEXT,
+                minhash BLOB
+            );
+            CREATE INDEX IF NOT EXISTS resumes_score ON resumes (score DESC);
+            CREATE TABLE IF NOT EXISTS domains (
+                domain TEXT NOT NULL,
+                resume_id TEXT NOT NULL,
+                PRIMARY KEY (domain, resume_id)
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+        """)
+        self._check_criteria()
+        self._check_fingerprints()
+        self.conn.commit()
+
+    def _check_criteria(self):
+        # Features saved for another set of criteria are recomputed from
+        # the stored sections. Nothing is written when they match, so
+        # opening a store is not a write other connections see.
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'criteria'").fetchone()
+        criteria = json.dumps(CRITERIA)
+        if row is not None and row[0] == criteria:
+            return
+        if row is not None:
+            rows = self.conn.execute("SELECT resume_id, sections FROM resumes").fetchall()
+            if rows:
+                features = extract_features(to_columns([json.loads(s) for _, s in rows]))
+                self.conn.executemany(
+                    "UPDATE resumes SET features = ? WHERE resume_id = ?",
+                    [(f.tobytes(), rid) for (rid, _), f in zip(rows, features)]
+                )
+        self.conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('criteria', ?)", (criteria,)
+        )
+
+    def _check_fingerprints(self):
+        # Stores created before deduplication lack the columns; rows
+        # without a fingerprint, or with one made with other parameters,
+        # get it computed from their sections
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(resumes)")}
+        if "digest" not in columns:
+            self.conn.execute("ALTER TABLE resumes ADD COLUMN digest TEXT")
+            self.conn.execute("ALTER TABLE resumes ADD COLUMN minhash BLOB")
+
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'fingerprint'").fetchone()
+        params = json.dumps([SHINGLE_WORDS, NUM_PERM])
+        query = "SELECT resume_id, sections FROM resumes"
+        if row is not None and row[0] == params:
+            query += " WHERE minhash IS NULL"
+        rows = self.conn.execute(query).fetchall()
+        if rows:
+            self.conn.executemany(
+                "UPDATE resumes SET digest = ?, minhash = ? WHERE resume_id = ?",
+                [(*_fingerprint_columns(fingerprint(resume_text(json.loads(s)))), rid)
+                 for rid, s in rows]
+            )
+        if row is None or row[0] != params:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('fingerprint', ?)", (params,)
+            )
+
+    def upsert(self, results):
+        """
+        Adds or replaces resumes given as ingest results
+        ({"resume", "score", "sections"}); other rows are left alone.
+        """
+        results = list(results)
+        if not results:
+            return
+        features = extract_features(to_columns([r["sections"] for r in results]))
+        fps = [fingerprint(resume_text(r["sections"])) for r in results]
+        now = time.time()
+        with self.lock:
+            self._check_duplicates()
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO resumes "
+                "(resume_id, score, sections, features, updated, digest, minhash) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (r["resume"], r["score"], json.dumps(r["sections"]), f.tobytes(), now,
+                     *_fingerprint_columns(fp))
+                    for r, f, fp in zip(results, features, fps)
+                ]
+            )
+            self.conn.commit()
+            if self.duplicates is not None:
+                for r, fp in zip(results, fps):
+                    self.duplicates.add(r["resume"], fp)
+
+    def remove(self, resume_ids):
+        rows = [(rid,) for rid in resume_ids]
+        with self.lock:
+            self._check_duplicates()
+            self.conn.executemany("DELETE FROM resumes WHERE resume_id = ?", rows)
+            self.conn.executemany("DELETE FROM domains WHERE resume_id = ?", rows)
+            self.conn.commit()
+            if self.duplicates is not None:
+                for (rid,) in rows:
+                    self.duplicates.remove(rid)
+
+    def clear(self):
+        with self.lock:
+            self._check_duplicates()
+            self.conn.execute("DELETE FROM resumes")
+            self.conn.execute("DELETE FROM domains")
+            self.conn.commit()
+            if self.duplicates is not None:
+                self.duplicates = DuplicateIndex(self.duplicates.threshold)
+
+    def get(self, resume_id):
+        """
+        Returns {"resume", "score", "sections"} or None.
+        """
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT score, sections FROM resumes WHERE resume_id = ?", (resume_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"resume": resume_id, "score": _number(row[0]), "sections": json.loads(row[1])}
+
+    def score(self, resume_id):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT score FROM resumes WHERE resume_id = ?", (resume_id,)
+            ).fetchone()
+        return None if row is None else _number(row[0])
+
+    def results(self):
+        """
+        Every stored resume in the ingest result shape, e.g. for
+        ResumeSemanticSearch.sync().
+        """
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT resume_id, score, sections FROM resumes ORDER BY resume_id"
+            ).fetchall()
+        return [
+            {"resume": rid, "score": _number(score), "sections": json.loads(sections)}
+            for rid, score, sections in rows
+        ]
+
+    def ranking(self):
+        """
+        [(resume_id, score), ...], best first.
+        """
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT resume_id, score FROM resumes ORDER BY score DESC, resume_id"
+            ).fetchall()
+        return [(rid, _number(score)) for rid, score in rows]
+
+    def features(self):
+        """
+        (resume_ids, features) with one row of raw CRITERIA features per
+        resume, ready for scorer.rank().
+        """
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT resume_id, features FROM resumes ORDER BY resume_id"
+            ).fetchall()
+        names = [rid for rid, _ in rows]
+        features = np.frombuffer(b"".join(f for _, f in rows), dtype=np.float64)
+        return names, features.reshape(len(rows), len(CRITERIA))
+
+    def data_version(self):
+        """
+        Changes whenever another connection or process commits to the
+        pool; this store's own writes leave it as it is.
+        """
+        with self.lock:
+            return self._data_version()
+
+    def _data_version(self):
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _check_duplicates(self):
+        # Called with the lock held: drops the duplicate index if another
+        # connection has written since it was last brought up to date
+        if self.duplicates is not None:
+            version = self._data_version()
+            if version != self.duplicates_version:
+                self.duplicates = None
+
+    def duplicate_index(self, threshold=DUPLICATE_THRESHOLD):
+        """
+        DuplicateIndex of the stored pool, for dedup.collapse_duplicates().
+        It is read from SQLite once and then updated by this store's own
+        writes, so later calls are free unless another process or
+        connection changed the pool.
+        """
+        with self.lock:
+            self._check_duplicates()
+            if self.duplicates is not None and self.duplicates.threshold == threshold:
+                return self.duplicates
+
+            self.duplicates_version = self._data_version()
+            rows = self.conn.execute(
+                "SELECT resume_id, digest, minhash FROM resumes WHERE minhash IS NOT NULL"
+            ).fetchall()
+            self.duplicates = DuplicateIndex(threshold)
+            for rid, digest, minhash in rows:
+                self.duplicates.add(rid, (digest, np.frombuffer(minhash, dtype=np.uint32)))
+            return self.duplicates
+
+    def set_domains(self, domain_groups):
+        """
+        Replaces the classification with {domain: [resume_id, ...]}.
+        """
+        # Duplicate ids collapse; the order within a domain is kept
+        rows = dict.fromkeys(
+            (domain, rid) for domain, ids in domain_groups.items() for rid in ids
+        )
+        with self.lock:
+            self.conn.execute("DELETE FROM domains")
+            self.conn.executemany(
+                "INSERT INTO domains (domain, resume_id) VALUES (?, ?)", list(rows)
+            )
+            self.conn.commit()
+
+    def domains(self):
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT domain, resume_id FROM domains ORDER BY rowid"
+            ).fetchall()
+        groups = {}
+        for domain, rid in rows:
+            groups.setdefault(domain, []).append(rid)
+        return groups
+
+    def import_outputs(self, output_dir):
+        """
+        Loads a pool saved by older versions as extracted.json, ranking.csv
+        and domains.json. Returns the number of resumes imported.
+        """
+        extracted_path = os.path.join(output_dir, "extracted.json")
+        ranking_path = os.path.join(output_dir, "ranking.csv")
+        domains_path = os.path.join(output_dir, "domains.json")
+        if not os.path.exists(extracted_path) or not os.path.exists(ranking_path):
+            return 0
+
+        with open(extracted_path) as f:
+            extracted = json.load(f)
+        with open(ranking_path, newline="") as f:
+            scores = {row["Resume"]: float(row["Score"]) for row in csv.DictReader(f)}
+
+        self.upsert(
+            {"resume": name, "score": scores[name], "sections": sections}
+            for name, sections in extracted.items()
+            if name in scores
+        )
+
+        if os.path.exists(domains_path):
+            with open(domains_path) as f:
+                self.set_domains(json.load(f))
+        return len(self)
+
+    def __contains__(self, resume_id):
+        with self.lock:
+            return self.conn.execute(
+                "SELECT 1 FROM resumes WHERE resume_id = ?", (resume_id,)
+            ).fetchone() is not None
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM resumes").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+def _fingerprint_columns(fp):
+    return (None, None) if fp is None else (fp[0], fp[1].tobytes())
+
+
+def _number(value):
+    return int(value) if float(value).is_integer() else value
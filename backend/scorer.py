@@ -1,13 +1,32 @@
 import re
 
+import numpy as np
+
+from backend.instrumentation import instrument
+
+# Points each criterion is worth; breakdowns use these labels and
+# columns appear in this order in every feature/breakdown matrix
 WEIGHTS = {
-    "internships": 20,
-    "skills": 20,
-    "projects": 15,
-    "cgpa": 10,
-    "achievements": 10
+    "Internships": 20,
+    "Skills": 20,
+    "Projects": 15,
+    "CGPA": 10,
+    "Achievements": 10,
+    "Experience": 5,
+    "Extras": 5
 }
 
+CRITERIA = list(WEIGHTS)
+
+# Raw feature value at which a criterion earns its full weight, e.g. ten
+# comma separated skills or three project lines
+SATURATION = np.array([1, 10, 3, 1, 1, 1, 1], dtype=np.float64)
+
+SECTION_NAMES = ["education", "skills", "experience", "projects", "achievements", "extras"]
+
+INTERN_PATTERN = re.compile("intern", re.IGNORECASE)
+CGPA_PATTERN = re.compile("cgpa", re.IGNORECASE)
+
 def extract_cgpa(text):
     match = re.search(r'cgpa[:\s]*([\d\.]{3,4})', text.lower())
     if match:
@@ -18,55 +37,84 @@ def extract_cgpa(text):
     return None
 
 
-def score_skills(text):
-    skills = re.split(r',|\n|\|', text)
-    skills = [s.strip() for s in skills if len(s.strip()) > 2]
-    count = len(set(skills))
-    if count >= 10: return 20
-    if count >= 7: return 16
-    if count >= 4: return 12
-    if count >= 1: return 6
-    return 0
+def to_columns(sections_list):
+    """
+    [{"skills": ..., ...}, ...] -> {"skills": [...], ...}, one list of
+    section text per section name.
+    """
+    return {
+        name: [s.get(name, "") for s in sections_list]
+        for name in SECTION_NAMES
+    }
+
+
+def extract_features(columns):
+    """
+    Raw per-criterion features as an (N x criteria) matrix, columns in
+    CRITERIA order: intern mention, skill fragments, project newlines,
+    CGPA mention, and whether achievements/experience/extras exist.
+    """
+    n = len(columns["skills"])
+    features = np.empty((n, len(CRITERIA)), dtype=np.float64)
+
+    features[:, 0] = [INTERN_PATTERN.search(t) is not None for t in columns["experience"]]
+    features[:, 1] = [t.count(",") + 1 for t in columns["skills"]]
+    features[:, 2] = [t.count("\n") for t in columns["projects"]]
+    features[:, 3] = [CGPA_PATTERN.search(t) is not None for t in columns["education"]]
+    features[:, 4] = [bool(t) for t in columns["achievements"]]
+    features[:, 5] = [bool(t) for t in columns["experience"]]
+    features[:, 6] = [bool(t) for t in columns["extras"]]
+    return features
+
+
+def weight_vector(weights=None):
+    weights = WEIGHTS if weights is None else {**WEIGHTS, **weights}
+    return np.array([weights[c] for c in CRITERIA], dtype=np.float64)
 
-def score_projects(text):
-    count = len([l for l in text.split("\n") if len(l.strip()) > 20])
-    return min(count * 3, 15)
 
-def score_internships(text):
-    count = text.lower().count("intern")
-    return min(count * 10, 20)
+def score_features(features, weights=None):
+    """
+    Returns (totals, breakdown) for a feature matrix: breakdown[i, j] is
+    the points resume i earns for CRITERIA[j] under `weights` (defaults
+    to WEIGHTS; a partial dict overrides single criteria).
+    """
+    earned = np.minimum(features, SATURATION) / SATURATION
+    weights = weight_vector(weights)
+    return earned @ weights, earned * weights
 
-def score_achievements(text):
-    count = text.count("%") + text.count("rank")
-    return min(count * 5, 10)
 
-def score_resume(sections):
-    score = 0
+def rank(names, features, weights=None):
+    """
+    Re-ranks a pool from its saved feature matrix (see extract_features)
+    without touching the resumes. Returns [(name, score), ...], best first.
+    """
+    totals, _ = score_features(features, weights)
+    order = np.argsort(-totals, kind="stable")
+    return [(names[i], _tidy(totals[i])) for i in order]
 
-    score += score_skills(sections["skills"])
-    score += score_projects(sections["projects"])
-    score += score_internships(sections["experience"])
-    score += score_achievements(sections["achievements"])
 
-    cgpa = extract_cgpa(sections["education"])
-    if cgpa:
-        score += min((cgpa / 10) * 10, 10)
+@instrument("score_batch", lambda args, kwargs, result: {"batch": len(result[0])})
+def score_batch(columns, weights=None):
+    """
+    Scores N resumes at once. `columns` maps each section name to a list
+    of N section texts (see to_columns). Returns (totals, breakdown) as
+    arrays of shape (N,) and (N, len(CRITERIA)).
+    """
+    return score_features(extract_features(columns), weights)
 
-    return round(score, 2)
+
+def _tidy(value):
+    value = round(float(value), 2)
+    return int(value) if value.is_integer() else value
+
+
+@instrument("score_resume")
 def score_resume(sections, return_breakdown=False):
-    breakdown = {
-        "Internships": 20 if "intern" in sections["experience"].lower() else 0,
-        "Skills": min(len(sections["skills"].split(",")) * 2, 20),
-        "Projects": min(sections["projects"].count("\n") * 5, 15),
-        "CGPA": 10 if "cgpa" in sections["education"].lower() else 0,
-        "Achievements": 10 if sections["achievements"] else 0,
-        "Experience": 5 if sections["experience"] else 0,
-        "Extras": 5 if sections["extras"] else 0
-    }
+    totals, breakdown = score_batch(to_columns([sections]))
 
-    total = sum(breakdown.values())
+    total = _tidy(totals[0])
 
     if return_breakdown:
-        return total, breakdown
+        return total, {c: _tidy(v) for c, v in zip(CRITERIA, breakdown[0])}
 
     return total
@@ -1,3 +1,10 @@
+import re
+
+from backend.instrumentation import instrument
+
+# Bump whenever split output changes; it invalidates cached extractions
+SPLITTER_VERSION = 1
+
 SECTION_HEADERS = {
     "education": ["education", "academic"],
     "skills": ["skills", "technical skills"],
@@ -7,17 +14,114 @@ SECTION_HEADERS = {
     "extras": ["activities", "languages", "hobbies"]
 }
 
-def split_sections(text):
-    sections = {k: "" for k in SECTION_HEADERS}
-    current = None
 
-    for line in text.split("\n"):
-        l = line.lower()
-        for section, keys in SECTION_HEADERS.items():
-            if any(k in l for k in keys):
-                current = section
-                break
-        if current:
-            sections[current] += line + "\n"
+def compile_headers(headers):
+    """
+    Builds one pattern that finds every header line in a single scan.
+    A header line starts with a keyword, optionally after bullets and up
+    to two words ("Extra Activities:"); the named group says which section
+    it opens.
+    """
+    groups = []
+    for section, keys in headers.items():
+        # Longest first so "technical skills" wins over "skills"
+        keys = sorted(keys, key=len, reverse=True)
+        groups.append(f"(?P<{section}>" + "|".join(re.escape(k) for k in keys) + ")")
+
+    return re.compile(
+        r"^[^\S\n]*[^\w\n]*(?:[^\W\d_]+[^\S\n]+){0,2}?\b(?:" + "|".join(groups) + ")",
+        re.IGNORECASE | re.MULTILINE
+    )
+
+
+HEADER_PATTERN = compile_headers(SECTION_HEADERS)
+
+
+def _consume(block, base, current, parts, offsets):
+    """
+    Assigns a run of complete lines to sections, continuing the section
+    that was open at the end of the previous run. Returns the section
+    open at the end of this one.
+    """
+    headers = [(m.start(), m.lastgroup) for m in HEADER_PATTERN.finditer(block)]
+
+    # Lines before the first header belong to the section already open
+    first = headers[0][0] if headers else len(block)
+    if current and first:
+        parts[current].append(block[:first])
+        offsets[current].append((base, base + first))
+
+    for i, (start, section) in enumerate(headers):
+        end = headers[i + 1][0] if i + 1 < len(headers) else len(block)
+        parts[section].append(block[start:end])
+        offsets[section].append((base + start, base + end))
+        current = section
+
+    return current
+
+
+def _finish(parts, offsets, current, return_offsets):
+    # Every line is kept with its newline, the last one included
+    if current:
+        parts[current].append("\n")
+
+    sections = {k: "".join(v) for k, v in parts.items()}
+
+    if return_offsets:
+        # Spans continued across chunks are merged back together
+        for section, spans in offsets.items():
+            merged = []
+            for start, end in spans:
+                if merged and merged[-1][1] == start:
+                    merged[-1] = (merged[-1][0], end)
+                else:
+                    merged.append((start, end))
+            offsets[section] = merged
+        return sections, offsets
 
     return sections
+
+
+@instrument("split_sections", lambda args, kwargs, result: {"chars": len(args[0])})
+def split_sections(text, return_offsets=False):
+    """
+    Returns {section: text}. Each section holds its header line and every
+    line up to the next header; text before the first header is dropped.
+
+    With return_offsets=True also returns {section: [(start, end), ...]},
+    the character spans in `text` each section was taken from.
+    """
+    parts = {k: [] for k in SECTION_HEADERS}
+    offsets = {k: [] for k in SECTION_HEADERS}
+
+    current = _consume(text, 0, None, parts, offsets)
+    return _finish(parts, offsets, current, return_offsets)
+
+
+@instrument("split_sections_stream")
+def split_sections_stream(chunks, return_offsets=False):
+    """
+    Same result as split_sections("".join(chunks)), but consumes the
+    chunks (e.g. PDF pages from extractor.iter_text) as they arrive
+    instead of waiting for the whole text.
+    """
+    parts = {k: [] for k in SECTION_HEADERS}
+    offsets = {k: [] for k in SECTION_HEADERS}
+    current = None
+    pending = ""
+    base = 0
+
+    for chunk in chunks:
+        block = pending + chunk
+        # Headers are matched per line, so hold back the unfinished one
+        cut = block.rfind("\n") + 1
+        if not cut:
+            pending = block
+            continue
+
+        current = _consume(block[:cut], base, current, parts, offsets)
+        base += cut
+        pending = block[cut:]
+
+    current = _consume(pending, base, current, parts, offsets)
+    return _finish(parts, offsets, current, return_offsets)
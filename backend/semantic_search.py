@@ -1,7 +1,16 @@
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
+import os
+import json
+import zipfile
+
 import numpy as np
 
+from backend.embedding_cache import embedding_key, open_cache, query_cache
+from backend.model_registry import get_model
+from backend.instrumentation import count, instrument
+from backend.vector_index import BruteForceIndex, load_index, normalize_rows, top_k_indices
+
+MODEL_NAME = "all-MiniLM-L6-v2"
+
 DOMAIN_QUERIES = {
     "Machine Learning": "machine learning deep learning ml neural networks computer vision nlp",
     "Data Science": "data science analytics statistics python pandas numpy sql visualization",
@@ -41,20 +50,63 @@ def build_search_text(sections):
     return ". ".join(summary)
 
 class ResumeSemanticSearch:
-    def __init__(self):
-        self.model = SentenceTransformer("all-MiniLM-L6-v2")
+    def __init__(self, model_name=MODEL_NAME, cache_dir=None, index=None, encoder=None):
+        self.model_name = model_name
+        # Anything with the SharedModel.encode signature, e.g. a
+        # BatchingEncoder shared by concurrent requests
+        self.encoder = encoder
         self.resume_ids = []
-        self.embeddings = []
+        # Content hash of the search text behind each row, used to skip
+        # re-embedding resumes that did not change
+        self.text_keys = []
+        self.positions = {}
+        self.cache = open_cache(cache_dir, model_name) if cache_dir else None
+        self.query_cache = query_cache(model_name)
+        # Any object with build/add/remove/update/search/save; see
+        # backend/vector_index.py
+        self.index = index if index is not None else BruteForceIndex()
 
-    def index_resumes(self, resume_data):
+    @property
+    def embeddings(self):
+        return self.index.vectors
+
+    @property
+    def model(self):
+        if self.encoder is not None:
+            return self.encoder
+        # Shared per process and only loaded on the first encode
+        return get_model(self.model_name)
+
+    @instrument("embed", lambda args, kwargs, result: {"texts": len(args[1])})
+    def embed(self, texts):
         """
-        resume_data = [
-          {
-            "resume": "resume_1.txt",
-            "sections": {...}
-          }
-        ]
+        Encodes texts, reusing vectors from the embedding cache so only
+        text that has never been seen by this model hits the encoder.
         """
+        if self.cache is None:
+            return self.model.encode(texts, convert_to_numpy=True)
+
+        keys = [self.cache.key(t) for t in texts]
+        cached = self.cache.get(keys)
+
+        missing = {}
+        for k, t in zip(keys, texts):
+            if k not in cached and k not in missing:
+                missing[k] = t
+
+        count("embedding_cache.hits", len(keys) - len(missing))
+        count("embedding_cache.misses", len(missing))
+
+        if missing:
+            vectors = self.model.encode(list(missing.values()), convert_to_numpy=True)
+            self.cache.put(list(missing), vectors)
+            cached.update(zip(missing, vectors))
+            self.cache.flush()
+
+        return np.array([cached[k] for k in keys], dtype=np.float32)
+
+    def _search_texts(self, resume_data):
+        ids = []
         texts = []
         for r in resume_data:
             # Prefer pre-flattened text if provided
@@ -64,22 +116,278 @@ class ResumeSemanticSearch:
                 text = build_search_text(r["sections"])
 
             texts.append(text)
-            self.resume_ids.append(r.get("Resume") or r.get("resume"))
+            ids.append(r.get("Resume") or r.get("resume"))
+        return ids, texts
 
-        self.embeddings = self.model.encode(texts, convert_to_numpy=True)
+    def _reposition(self):
+        self.positions = {r: i for i, r in enumerate(self.resume_ids)}
 
-    def search(self, query, top_k=5):
-        query_vec = self.model.encode([query], convert_to_numpy=True)
-        scores = cosine_similarity(query_vec, self.embeddings)[0]
+    def add(self, resume_data):
+        """
+        Adds resumes that are not indexed yet. Raises ValueError for ids
+        that are already present; use upsert to replace them.
+        """
+        ids, texts = self._search_texts(resume_data)
+        duplicates = [r for r in ids if r in self.positions]
+        if duplicates or len(set(ids)) != len(ids):
+            raise ValueError(f"Resumes already indexed: {duplicates or ids}")
+        if not ids:
+            return
 
-        ranked = sorted(
-            zip(self.resume_ids, scores),
-            key=lambda x: x[1],
-            reverse=True
-        )
+        # Stored unit-length so cosine similarity is a plain dot product
+        vectors = normalize_rows(self.embed(texts))
+        if len(self.resume_ids) == 0:
+            self.index.build(vectors)
+        else:
+            self.index.add(vectors)
 
-        return ranked[:top_k]
+        self.resume_ids.extend(ids)
+        self.text_keys.extend(embedding_key(t, self.model_name) for t in texts)
+        self._reposition()
 
+    def remove(self, resume_ids):
+        """
+        Drops resumes from the index; unknown ids are ignored. Returns the
+        number removed.
+        """
+        drop = sorted({self.positions[r] for r in resume_ids if r in self.positions})
+        if not drop:
+            return 0
+
+        self.index.remove(drop)
+        dropped = set(drop)
+        self.resume_ids = [r for i, r in enumerate(self.resume_ids) if i not in dropped]
+        self.text_keys = [k for i, k in enumerate(self.text_keys) if i not in dropped]
+        self._reposition()
+        return len(drop)
+
+    @instrument("upsert", lambda args, kwargs, result: {"batch": len(args[1]), "embedded": result})
+    def upsert(self, resume_data):
+        """
+        Adds new resumes and re-embeds existing ones whose search text
+        changed. Unchanged resumes are left alone. Returns the number of
+        resumes that were embedded.
+        """
+        ids, texts = self._search_texts(resume_data)
+
+        # Last entry wins when an id appears more than once
+        changed = {}
+        for resume_id, text in zip(ids, texts):
+            key = embedding_key(text, self.model_name)
+            pos = self.positions.get(resume_id)
+            if pos is not None and self.text_keys[pos] == key:
+                changed.pop(resume_id, None)
+                continue
+            changed[resume_id] = (text, key)
+
+        if not changed:
+            return 0
+
+        vectors = normalize_rows(self.embed([t for t, _ in changed.values()]))
+
+        update_rows, update_vectors = [], []
+        new_ids, new_keys, new_vectors = [], [], []
+        for (resume_id, (_, key)), vec in zip(changed.items(), vectors):
+            pos = self.positions.get(resume_id)
+            if pos is None:
+                new_ids.append(resume_id)
+                new_keys.append(key)
+                new_vectors.append(vec)
+            else:
+                update_rows.append(pos)
+                update_vectors.append(vec)
+                self.text_keys[pos] = key
+
+        if update_rows:
+            self.index.update(update_rows, np.array(update_vectors))
+
+        if new_ids:
+            if len(self.resume_ids) == 0:
+                self.index.build(np.array(new_vectors))
+            else:
+                self.index.add(np.array(new_vectors))
+            self.resume_ids.extend(new_ids)
+            self.text_keys.extend(new_keys)
+            self._reposition()
+
+        return len(changed)
+
+    def sync(self, resume_data):
+        """
+        Makes the index hold exactly resume_data: removes resumes that are
+        no longer present and upserts the rest. Returns True if anything
+        changed.
+        """
+        ids, _ = self._search_texts(resume_data)
+        keep = set(ids)
+        removed = self.remove([r for r in self.resume_ids if r not in keep])
+        return bool(self.upsert(resume_data) or removed)
+
+    @instrument("index_resumes", lambda args, kwargs, result: {"batch": len(args[1])})
+    def index_resumes(self, resume_data):
+        """
+        resume_data = [
+          {
+            "resume": "resume_1.txt",
+            "sections": {...}
+          }
+        ]
+
+        Same as upsert: indexing a resume id twice replaces it.
+        """
+        self.upsert(resume_data)
+
+    def _index_dir(self, directory):
+        # Each index type is saved in its own subdirectory, so writers that
+        # use different types share `directory` without replacing each
+        # other's index and re-syncing the whole pool
+        name = self.index.kind
+        if getattr(self.index, "dtype", None):
+            name += "_" + self.index.dtype
+        return os.path.join(directory, name)
+
+    def save_index(self, directory):
+        directory = self._index_dir(directory)
+        os.makedirs(directory, exist_ok=True)
+        self.index.save(os.path.join(directory, "index.npz"))
+
+        meta_path = os.path.join(directory, "meta.json")
+        with open(meta_path + ".tmp", "w") as f:
+            json.dump({
+                "model": self.model_name,
+                "resume_ids": self.resume_ids,
+                "text_keys": self.text_keys
+            }, f)
+        os.replace(meta_path + ".tmp", meta_path)
+
+    def load_index(self, directory):
+        """
+        Restores an index saved by save_index. Returns False when there is
+        none for this model and index type. Call sync() afterwards to bring
+        it up to date with the current resumes.
+        """
+        directory = self._index_dir(directory)
+        meta_path = os.path.join(directory, "meta.json")
+        index_path = os.path.join(directory, "index.npz")
+        if not os.path.exists(meta_path) or not os.path.exists(index_path):
+            return False
+
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta.get("model") != self.model_name:
+            return False
+
+        try:
+            load_index(index_path, self.index)
+        except (ValueError, OSError, EOFError, zipfile.BadZipFile):
+            return False
+
+        # meta.json and index.npz are replaced one after the other; a pair
+        # from different saves is dropped and rebuilt by sync()
+        if len(self.index) != len(meta["resume_ids"]):
+            self.index.build(np.zeros((0, 0), dtype=np.float32))
+            self.resume_ids, self.text_keys = [], []
+            self._reposition()
+            return False
+
+        self.resume_ids = meta["resume_ids"]
+        self.text_keys = meta["text_keys"]
+        self._reposition()
+        return True
+
+    def encode_queries(self, queries, persist=False):
+        """
+        Unit-length query vectors. Repeated queries come from the shared
+        in-memory LRU and first-time queries go straight to the model.
+        persist=True also routes them through the on-disk embedding cache,
+        for fixed probes such as DOMAIN_QUERIES that should survive
+        restarts; one-off searches are not written to disk.
+        """
+        queries = list(queries)
+        keys = [embedding_key(q, self.model_name) for q in queries]
+        found = self.query_cache.get(keys)
+
+        missing = {}
+        for k, q in zip(keys, queries):
+            if k not in found and k not in missing:
+                missing[k] = q
+
+        count("query_cache.hits", len(keys) - len(missing))
+        count("query_cache.misses", len(missing))
+
+        if missing:
+            texts = list(missing.values())
+            if persist:
+                vectors = self.embed(texts)
+            else:
+                vectors = self.model.encode(texts, convert_to_numpy=True)
+            vectors = normalize_rows(vectors)
+            self.query_cache.put(list(missing), vectors)
+            found.update(zip(missing, vectors))
+
+        if not queries:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.array([found[k] for k in keys], dtype=np.float32)
+
+    def warm_queries(self, queries):
+        """
+        Encodes queries ahead of time, e.g. DOMAIN_QUERIES.values() at
+        startup, keeping them in the on-disk cache.
+        """
+        self.encode_queries(queries, persist=True)
+
+    def score_queries(self, queries, persist=False):
+        """
+        Encodes all queries in one batch and returns the (queries x resumes)
+        cosine similarity matrix.
+        """
+        if len(self.resume_ids) == 0:
+            return np.zeros((len(queries), 0), dtype=np.float32)
+
+        return self.index.scores(self.encode_queries(queries, persist=persist))
+
+    def score_resumes(self, queries, resume_ids):
+        """
+        (queries x resume_ids) similarities for the given resumes only,
+        e.g. candidates that passed a keyword filter.
+        """
+        positions = [self.positions[r] for r in resume_ids]
+        if not positions:
+            return np.zeros((len(queries), 0), dtype=np.float32)
+        return self.encode_queries(queries) @ self.index.reconstruct(positions).T
+
+    def search_many(self, queries, top_k=5):
+        if len(self.resume_ids) == 0:
+            return [[] for _ in queries]
+
+        return self.search_vectors(self.encode_queries(queries), top_k)
+
+    def search_vectors(self, query_vectors, top_k=5):
+        """
+        search_many for queries that are already encoded (unit length).
+        """
+        if len(self.resume_ids) == 0:
+            return [[] for _ in query_vectors]
+
+        hits = self.index.search(query_vectors, top_k)
+        return [
+            [(self.resume_ids[i], float(score)) for i, score in zip(idx, scores)]
+            for idx, scores in hits
+        ]
+
+    @instrument("search")
+    def search(self, query, top_k=5):
+        return self.search_many([query], top_k=top_k)[0]
+
+    def search_among(self, query, resume_ids, top_k=5):
+        """
+        search restricted to resume_ids; ids that are not indexed are skipped.
+        """
+        candidates = [r for r in resume_ids if r in self.positions]
+        similarities = self.score_resumes([query], candidates)[0]
+        return [(candidates[i], float(similarities[i])) for i in top_k_indices(similarities, top_k)]
+
+    @instrument("classify_by_domain", lambda args, kwargs, result: {"domains": len(args[1])})
     def classify_by_domain(self, domain_queries, threshold=0.20):
         """
         Returns:
@@ -89,13 +397,15 @@ class ResumeSemanticSearch:
         }
         """
 
-        domain_groups = {d: [] for d in domain_queries}
-
-        for domain, query in domain_queries.items():
-            results = self.search(query, top_k=len(self.resume_ids))
+        domains = list(domain_queries)
+        scores = self.score_queries([domain_queries[d] for d in domains], persist=True)
+        hits = scores >= threshold
 
-            for resume_id, score in results:
-                if score >= threshold:
-                    domain_groups[domain].append(resume_id)
+        domain_groups = {}
+        for row, domain in enumerate(domains):
+            idx = np.flatnonzero(hits[row])
+            # Best match first, as before
+            idx = idx[np.argsort(-scores[row, idx], kind="stable")]
+            domain_groups[domain] = [self.resume_ids[i] for i in idx]
 
         return domain_groups
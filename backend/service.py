@@ -0,0 +1,369 @@
+"""
+Local HTTP API over the analysis pipeline, for integrations that cannot
+go through the Streamlit pages.
+
+    python backend/service.py --port 8008
+
+    GET  /health
+    POST /score?name=cv.pdf[&add=1]   body: the file; add=1 also adds it to the pool
+                                      unless it duplicates a pooled resume
+    GET  /resumes/<resume_id>
+    POST /search    {"query": "...", "top_k": 5}  or  {"queries": [...]}
+    POST /classify  {"text": "..."}  or  {"resume": "resume_1.txt"}
+    GET  /domains[?threshold=0.22]
+
+One search engine lives for the whole process and concurrent encode
+calls are grouped into single model.encode batches.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs, unquote
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+import numpy as np
+
+from backend.ingest import load_sections
+from backend.extraction_cache import ExtractionCache
+from backend.resume_store import ResumeStore
+from backend.dedup import collapse_duplicates
+from backend.scorer import score_resume
+from backend.semantic_search import ResumeSemanticSearch, DOMAIN_QUERIES, MODEL_NAME, build_search_text
+from backend.model_registry import get_model
+from backend.batching import BatchingEncoder
+from backend.vector_index import make_index
+from backend import instrumentation
+
+OUTPUT_DIR = os.path.join(BASE_DIR, "outputs")
+EMBEDDING_CACHE_DIR = os.path.join(OUTPUT_DIR, "embedding_cache")
+SEARCH_INDEX_DIR = os.path.join(OUTPUT_DIR, "search_index")
+EXTRACTION_CACHE_PATH = os.path.join(OUTPUT_DIR, "extraction_cache.db")
+STORE_PATH = os.path.join(OUTPUT_DIR, "resumes.db")
+
+SUPPORTED = (".pdf", ".docx", ".txt")
+MAX_UPLOAD_BYTES = 20 * 1024 * 1024
+MAX_TOP_K = 100
+
+# The index is written back at most this often while resumes are added
+SAVE_INTERVAL = 10
+
+
+class RequestError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class ResumeService:
+    """
+    State shared by all request threads. Encoding runs outside the lock;
+    only the index lookups and updates are serialized. Resumes the app or
+    the watcher add to the store are picked up on the next request.
+    """
+
+    def __init__(self, index_kind="brute", nprobe=8, rerank=0, max_batch=64,
+                 max_wait=0.005, max_pages=20):
+        os.makedirs(OUTPUT_DIR, exist_ok=True)
+        self.max_pages = max_pages
+        self.store = ResumeStore(STORE_PATH)
+        self.cache = ExtractionCache(EXTRACTION_CACHE_PATH)
+        self.lock = threading.Lock()
+        self.dirty = False
+        self.domain_groups = {}
+
+        if index_kind == "ivf":
+            index = make_index("ivf", nprobe=nprobe)
+        elif index_kind in ("int8", "float16"):
+            index = make_index("quantized", dtype=index_kind, rerank=rerank)
+        else:
+            index = make_index(index_kind)
+        self.encoder = BatchingEncoder(
+            get_model(MODEL_NAME, warmup=True), max_batch=max_batch, max_wait=max_wait
+        )
+        self.engine = ResumeSemanticSearch(
+            cache_dir=EMBEDDING_CACHE_DIR, index=index,
+            encoder=self.encoder
+        )
+        self.engine.load_index(SEARCH_INDEX_DIR)
+        self.synced_version = self.store.data_version()
+        if self.engine.sync(self.store.results()):
+            self.engine.save_index(SEARCH_INDEX_DIR)
+        # Read once here, then kept up to date by the store's own writes
+        self.store.duplicate_index()
+
+        self.domains = list(DOMAIN_QUERIES)
+        self.domain_vectors = self.engine.encode_queries(
+            [DOMAIN_QUERIES[d] for d in self.domains], persist=True
+        )
+
+        threading.Thread(target=self._save_loop, name="index-saver", daemon=True).start()
+
+    def _save_loop(self):
+        while True:
+            time.sleep(SAVE_INTERVAL)
+            self.save()
+
+    def refresh(self):
+        """
+        Re-syncs the index with the store if another process wrote to it
+        since the last sync. Their resumes are encoded before taking the
+        lock, like score(add=1).
+        """
+        version = self.store.data_version()
+        if version == self.synced_version:
+            return
+        results = self.store.results()
+        self.engine.embed([build_search_text(r["sections"]) for r in results])
+        with self.lock:
+            if self.engine.sync(results):
+                self.domain_groups = {}
+                self.dirty = True
+            self.synced_version = version
+
+    def save(self):
+        # Only an index synced with the current store is saved, so the
+        # shared index is never replaced by a stale view of the pool
+        self.refresh()
+        with self.lock:
+            if self.dirty and self.store.data_version() == self.synced_version:
+                self.engine.save_index(SEARCH_INDEX_DIR)
+                self.dirty = False
+
+    def score(self, name, data, add=False):
+        name = os.path.basename(name or "")
+        if not name.lower().endswith(SUPPORTED):
+            raise RequestError(400, f"name must end with one of {', '.join(SUPPORTED)}")
+
+        # The body is parsed in memory, its format sniffed from its first bytes
+        try:
+            _, sections = load_sections((name, data), self.cache, max_pages=self.max_pages)
+        except Exception as e:
+            raise RequestError(422, f"could not parse {name}: {type(e).__name__}: {e}")
+
+        total, breakdown = score_resume(sections, return_breakdown=True)
+        result = {"resume": name, "score": total, "sections": sections}
+
+        duplicate_of = None
+        if add:
+            # Encoded before taking the lock; upsert then finds the vector
+            # in the embedding cache and only swaps it into the index
+            self.engine.embed([build_search_text(sections)])
+            self.refresh()
+            with self.lock:
+                added, duplicates = collapse_duplicates([result], self.store.duplicate_index())
+                if duplicates:
+                    duplicate_of = duplicates[0]["duplicate_of"]
+                    self.store.remove([name])
+                    self.engine.remove([name])
+                else:
+                    self.store.upsert(added)
+                    self.engine.upsert(added)
+                self.domain_groups = {}
+                self.dirty = True
+
+        return dict(result, breakdown=breakdown, added=bool(add) and duplicate_of is None,
+                    duplicate_of=duplicate_of)
+
+    def search(self, queries, top_k):
+        vectors = self.engine.encode_queries(queries)
+        self.refresh()
+        with self.lock:
+            hits = self.engine.search_vectors(vectors, top_k)
+        return [
+            [
+                {"resume": r, "similarity": round(sim, 4), "score": self.store.score(r)}
+                for r, sim in matches
+            ]
+            for matches in hits
+        ]
+
+    def classify(self, text=None, resume_id=None):
+        if resume_id is not None:
+            self.refresh()
+            with self.lock:
+                pos = self.engine.positions.get(resume_id)
+                vector = None if pos is None else self.engine.index.reconstruct([pos])
+            if vector is None:
+                raise RequestError(404, f"unknown resume {resume_id!r}")
+        else:
+            vector = self.engine.encode_queries([text])
+
+        scores = (self.domain_vectors @ vector.T)[:, 0]
+        return {d: round(float(s), 4) for d, s in zip(self.domains, scores)}
+
+    def pool_domains(self, threshold):
+        self.refresh()
+        with self.lock:
+            groups = self.domain_groups.get(threshold)
+            if groups is None:
+                groups = {d: [] for d in self.domains}
+                if len(self.engine.resume_ids):
+                    scores = self.engine.index.scores(self.domain_vectors)
+                    for row, domain in enumerate(self.domains):
+                        idx = np.flatnonzero(scores[row] >= threshold)
+                        idx = idx[np.argsort(-scores[row, idx], kind="stable")]
+                        groups[domain] = [self.engine.resume_ids[i] for i in idx]
+                self.domain_groups[threshold] = groups
+        return groups
+
+
+def make_handler(service):
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _body(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            if length > MAX_UPLOAD_BYTES:
+                # The body is left unread, so the connection cannot be reused
+                self.close_connection = True
+                raise RequestError(413, f"body larger than {MAX_UPLOAD_BYTES} bytes")
+            return self.rfile.read(length)
+
+        def _json(self):
+            try:
+                payload = json.loads(self._body() or b"{}")
+            except ValueError:
+                raise RequestError(400, "body is not valid JSON")
+            if not isinstance(payload, dict):
+                raise RequestError(400, "body must be a JSON object")
+            return payload
+
+        def _dispatch(self, routes):
+            url = urlparse(self.path)
+            params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            started = time.perf_counter()
+            try:
+                for prefix, handle in routes:
+                    if url.path == prefix or (prefix.endswith("/") and url.path.startswith(prefix)):
+                        self._send(200, handle(url.path[len(prefix):], params))
+                        break
+                else:
+                    raise RequestError(404, f"no route for {self.command} {url.path}")
+            except RequestError as e:
+                self._send(e.status, {"error": str(e)})
+            except Exception as e:
+                self._send(500, {"error": f"{type(e).__name__}: {e}"})
+            route = url.path.strip("/").split("/")[0]
+            instrumentation.record(f"http.{route}", started, time.perf_counter() - started)
+
+        def do_GET(self):
+            self._dispatch([
+                ("/health", self.health),
+                ("/resumes/", self.get_resume),
+                ("/domains", self.domains)
+            ])
+
+        def do_POST(self):
+            self._dispatch([
+                ("/score", self.score),
+                ("/search", self.search),
+                ("/classify", self.classify)
+            ])
+
+        def health(self, rest, params):
+            return {"status": "ok", "resumes": len(service.engine.resume_ids)}
+
+        def get_resume(self, rest, params):
+            resume = service.store.get(unquote(rest))
+            if resume is None:
+                raise RequestError(404, f"unknown resume {unquote(rest)!r}")
+            return resume
+
+        def domains(self, rest, params):
+            try:
+                threshold = float(params.get("threshold", 0.22))
+            except ValueError:
+                raise RequestError(400, "threshold must be a number")
+            return service.pool_domains(threshold)
+
+        def score(self, rest, params):
+            add = params.get("add", "0") not in ("", "0", "false")
+            return service.score(params.get("name"), self._body(), add=add)
+
+        def search(self, rest, params):
+            payload = self._json()
+            if "queries" in payload:
+                queries = payload["queries"]
+            elif "query" in payload:
+                queries = [payload["query"]]
+            else:
+                raise RequestError(400, "expected 'query' or 'queries'")
+            if not queries or not all(isinstance(q, str) and q.strip() for q in queries):
+                raise RequestError(400, "queries must be non-empty strings")
+
+            try:
+                top_k = max(1, min(int(payload.get("top_k", 5)), MAX_TOP_K))
+            except (TypeError, ValueError):
+                raise RequestError(400, "top_k must be an integer")
+            matches = service.search(queries, top_k)
+            return {"matches": matches} if "queries" in payload else {"matches": matches[0]}
+
+        def classify(self, rest, params):
+            payload = self._json()
+            if payload.get("resume"):
+                return {"domains": service.classify(resume_id=payload["resume"])}
+            text = payload.get("text")
+            if not text and isinstance(payload.get("sections"), dict):
+                text = build_search_text(payload["sections"])
+            if not text:
+                raise RequestError(400, "expected 'resume', 'text' or 'sections'")
+            return {"domains": service.classify(text=text)}
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve resume scoring and search over HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8008)
+    parser.add_argument("--index", choices=["brute", "ivf", "int8", "float16"], default="brute",
+                        help="vector index type: ivf for very large pools, int8/float16 "
+                             "to store vectors quantized")
+    parser.add_argument("--nprobe", type=int, default=8, help="IVF lists scanned per query")
+    parser.add_argument("--rerank", type=int, default=0,
+                        help="quantized indexes re-score rerank * top_k candidates against float32 "
+                             "vectors kept in a file next to the index (default 0, off)")
+    parser.add_argument("--max-batch", type=int, default=64,
+                        help="most texts encoded in one model call")
+    parser.add_argument("--max-wait-ms", type=float, default=5,
+                        help="how long a request waits for others to batch with")
+    args = parser.parse_args()
+
+    service = ResumeService(
+        index_kind=args.index, nprobe=args.nprobe, rerank=args.rerank,
+        max_batch=args.max_batch, max_wait=args.max_wait_ms / 1000
+    )
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(service))
+    print(f"Serving {len(service.engine.resume_ids)} resumes on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.save()
+        if instrumentation.ENABLED:
+            print(instrumentation.report())
+
+
+if __name__ == "__main__":
+    main()
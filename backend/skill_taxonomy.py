@@ -0,0 +1,182 @@
+# Canonical skill name -> spellings seen in resumes. Matching is case
+# insensitive and works on whole words, so "java" never matches inside
+# "javascript". Spellings are tokenized like resume text: "ci/cd" is the
+# phrase "ci cd", "node.js" stays one word.
+SKILL_TAXONOMY = {
+    # Languages
+    "Python": ["python", "python3", "python 3", "py3"],
+    "Java": ["java", "core java", "java 8", "java 11", "java 17"],
+    "JavaScript": ["javascript", "java script", "js", "es6", "ecmascript"],
+    "TypeScript": ["typescript"],
+    "C++": ["c++", "cpp", "c plus plus"],
+    "C#": ["c#", "csharp", "c sharp"],
+    "Go": ["golang", "go lang"],
+    "Rust": ["rustlang"],
+    "Kotlin": ["kotlin"],
+    "Swift": ["swiftui"],
+    "Objective-C": ["objective-c", "objective c", "objc"],
+    "Ruby": ["ruby"],
+    "PHP": ["php"],
+    "Scala": ["scala"],
+    "Perl": ["perl"],
+    "MATLAB": ["matlab"],
+    "Bash": ["bash", "shell scripting", "shell script", "unix shell", "zsh"],
+    "PowerShell": ["powershell"],
+    "SQL": ["sql", "structured query language", "t-sql", "pl/sql", "plsql"],
+    "HTML": ["html", "html5"],
+    "CSS": ["css", "css3"],
+    "Solidity": ["solidity"],
+    "Assembly": ["assembly", "assembly language", "x86 assembly"],
+    "VHDL": ["vhdl"],
+    "Verilog": ["verilog", "systemverilog"],
+
+    # Web frameworks and front end
+    "React": ["react", "react.js", "reactjs", "react js"],
+    "React Native": ["react native", "react-native"],
+    "Angular": ["angular", "angularjs", "angular.js"],
+    "Vue": ["vue", "vue.js", "vuejs"],
+    "Next.js": ["next.js", "nextjs", "next js"],
+    "Svelte": ["svelte", "sveltekit"],
+    "Redux": ["redux"],
+    "jQuery": ["jquery"],
+    "Bootstrap": ["bootstrap"],
+    "Tailwind CSS": ["tailwind", "tailwindcss", "tailwind css"],
+    "Sass": ["sass", "scss"],
+    "Node.js": ["node.js", "nodejs", "node js"],
+    "Express": ["express.js", "expressjs"],
+    "Django": ["django", "django rest framework", "drf"],
+    "Flask": ["flask"],
+    "FastAPI": ["fastapi", "fast api"],
+    "Spring": ["spring boot", "springboot", "spring mvc", "spring framework"],
+    "Hibernate": ["hibernate"],
+    "ASP.NET": ["asp.net", "asp.net core", ".net core", ".net", "dotnet"],
+    "Ruby on Rails": ["ruby on rails", "ror"],
+    "Laravel": ["laravel"],
+    "GraphQL": ["graphql"],
+    "REST APIs": ["rest api", "rest apis", "restful", "restful api", "restful apis"],
+    "WebSockets": ["websocket", "websockets", "socket.io"],
+    "Streamlit": ["streamlit"],
+    "Flutter": ["flutter"],
+    "Jetpack Compose": ["jetpack compose"],
+    "Android SDK": ["android sdk", "android studio", "android development"],
+    "iOS": ["ios", "ios development", "xcode"],
+
+    # Data and machine learning
+    "Machine Learning": ["machine learning", "ml"],
+    "Deep Learning": ["deep learning", "dl"],
+    "Natural Language Processing": ["natural language processing", "nlp"],
+    "Computer Vision": ["computer vision", "image processing"],
+    "Reinforcement Learning": ["reinforcement learning", "rl"],
+    "Generative AI": ["generative ai", "genai", "gen ai", "llm", "llms", "large language models"],
+    "TensorFlow": ["tensorflow", "tensor flow", "tf", "keras"],
+    "PyTorch": ["pytorch", "torch"],
+    "scikit-learn": ["scikit-learn", "scikit learn", "sklearn"],
+    "XGBoost": ["xgboost", "lightgbm", "catboost"],
+    "Hugging Face": ["hugging face", "huggingface", "transformers"],
+    "LangChain": ["langchain"],
+    "OpenCV": ["opencv", "open cv"],
+    "spaCy": ["spacy"],
+    "NLTK": ["nltk"],
+    "Pandas": ["pandas"],
+    "NumPy": ["numpy"],
+    "SciPy": ["scipy"],
+    "Matplotlib": ["matplotlib"],
+    "Seaborn": ["seaborn"],
+    "Plotly": ["plotly"],
+    "Jupyter": ["jupyter", "jupyter notebook", "jupyterlab"],
+    "Statistics": ["statistics", "statistical analysis", "probability"],
+    "Data Analysis": ["data analysis", "data analytics", "exploratory data analysis", "eda"],
+    "Data Visualization": ["data visualization", "data visualisation"],
+    "Power BI": ["power bi", "powerbi"],
+    "Tableau": ["tableau"],
+    "Excel": ["ms excel", "microsoft excel", "advanced excel"],
+    "Apache Spark": ["apache spark", "pyspark"],
+    "Hadoop": ["hadoop", "hdfs", "mapreduce"],
+    "Kafka": ["kafka", "apache kafka"],
+    "Airflow": ["airflow", "apache airflow"],
+    "dbt": ["dbt"],
+    "ETL": ["etl", "elt", "data pipelines", "data pipeline"],
+    "MLOps": ["mlops", "mlflow", "kubeflow"],
+
+    # Databases
+    "MySQL": ["mysql"],
+    "PostgreSQL": ["postgresql", "postgres"],
+    "SQLite": ["sqlite"],
+    "Oracle": ["oracle db", "oracle database"],
+    "SQL Server": ["sql server", "mssql", "ms sql"],
+    "MongoDB": ["mongodb", "mongo"],
+    "Redis": ["redis"],
+    "Cassandra": ["cassandra"],
+    "Elasticsearch": ["elasticsearch", "elastic search", "elk"],
+    "DynamoDB": ["dynamodb"],
+    "Firebase": ["firebase", "firestore"],
+    "Snowflake": ["snowflake"],
+    "BigQuery": ["bigquery", "big query"],
+    "Neo4j": ["neo4j"],
+
+    # Cloud and DevOps
+    "AWS": ["aws", "amazon web services", "ec2", "s3", "aws lambda", "cloudformation"],
+    "Azure": ["azure", "microsoft azure"],
+    "GCP": ["gcp", "google cloud", "google cloud platform"],
+    "Docker": ["docker", "dockerfile", "containers", "containerization"],
+    "Kubernetes": ["kubernetes", "k8s", "eks", "aks", "gke"],
+    "Terraform": ["terraform"],
+    "Ansible": ["ansible"],
+    "Jenkins": ["jenkins"],
+    "CI/CD": ["ci/cd", "ci cd", "continuous integration", "continuous deployment", "github actions",
+              "gitlab ci"],
+    "Linux": ["linux", "ubuntu", "unix", "centos", "debian"],
+    "Nginx": ["nginx"],
+    "Prometheus": ["prometheus", "grafana"],
+    "Serverless": ["serverless"],
+    "Microservices": ["microservices", "micro services", "microservice architecture"],
+    "DevOps": ["devops", "dev ops"],
+    "Cloud Computing": ["cloud computing"],
+
+    # Tools and practices
+    "Git": ["git", "github", "gitlab", "bitbucket", "version control"],
+    "Jira": ["jira"],
+    "Agile": ["agile", "scrum", "kanban"],
+    "Unit Testing": ["unit testing", "pytest", "junit", "unittest", "tdd"],
+    "Selenium": ["selenium"],
+    "Postman": ["postman"],
+    "Figma": ["figma"],
+    "Data Structures and Algorithms": ["data structures", "algorithms", "dsa",
+                                       "data structures and algorithms"],
+    "Object-Oriented Programming": ["oop", "oops", "object oriented programming",
+                                    "object-oriented programming"],
+    "System Design": ["system design", "low level design", "high level design"],
+    "Operating Systems": ["operating systems", "operating system"],
+    "Computer Networks": ["computer networks", "computer networking", "networking", "tcp/ip"],
+    "DBMS": ["dbms", "database management systems", "rdbms"],
+    "Cybersecurity": ["cybersecurity", "cyber security", "network security", "penetration testing"],
+    "Blockchain": ["blockchain", "web3", "ethereum", "smart contracts"],
+    "IoT": ["iot", "internet of things", "arduino", "raspberry pi"],
+    "Embedded Systems": ["embedded systems", "embedded c", "microcontrollers"],
+    "Unity": ["unity3d", "unity engine"],
+    "AR/VR": ["ar/vr", "augmented reality", "virtual reality"],
+}
+
+# Words that also have an everyday meaning ("rest", "spring", "express")
+# count as skills only inside the skills section
+SKILLS_SECTION_ONLY = {
+    "C": ["c", "c programming", "c language"],
+    "R": ["r", "r programming", "rstudio"],
+    "Go": ["go"],
+    "TypeScript": ["ts"],
+    "Rust": ["rust"],
+    "Swift": ["swift"],
+    "Julia": ["julia"],
+    "Dart": ["dart"],
+    "Express": ["express"],
+    "Spring": ["spring"],
+    "Ruby on Rails": ["rails"],
+    "REST APIs": ["rest"],
+    "Computer Vision": ["cv"],
+    "Excel": ["excel"],
+    "Apache Spark": ["spark"],
+    "Oracle": ["oracle"],
+    "Kubernetes": ["helm"],
+    "Unit Testing": ["jest"],
+    "Unity": ["unity"],
+}
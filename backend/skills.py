@@ -0,0 +1,299 @@
+import os
+import re
+import json
+
+import numpy as np
+
+from backend.lexical_index import TOKEN_PATTERN, INDEXED_SECTIONS, pool_signature
+from backend.skill_taxonomy import SKILL_TAXONOMY, SKILLS_SECTION_ONLY
+
+# Marks the trie node where a spelling ends; tokens are never None
+_END = None
+
+QUERY_SPLIT = re.compile(r"(\(|\)|,|&|\||\bAND\b|\bOR\b|\bNOT\b)")
+QUERY_OPERATORS = {",": "AND", "&": "AND", "AND": "AND", "|": "OR", "OR": "OR", "NOT": "NOT"}
+
+
+def _tokens(text):
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class SkillMatcher:
+    """
+    Finds taxonomy skills in resume text.
+
+    Every spelling is compiled into a trie over words, and the text is
+    scanned once, taking the longest spelling that starts at each word
+    ("react native" before "react"). Spellings are a few words long, so a
+    scan is linear in the length of the text no matter how large the
+    taxonomy is.
+    """
+
+    def __init__(self, taxonomy=SKILL_TAXONOMY, section_only=SKILLS_SECTION_ONLY):
+        self.skills = list(dict.fromkeys([*taxonomy, *section_only]))
+        self.ids = {skill: i for i, skill in enumerate(self.skills)}
+        self.names = {" ".join(_tokens(skill)): skill for skill in self.skills}
+        self.trie = {}
+        self.section_trie = {}
+
+        for skill, spellings in taxonomy.items():
+            for spelling in spellings:
+                self._insert(self.trie, spelling, skill)
+                self._insert(self.section_trie, spelling, skill)
+        for skill, spellings in section_only.items():
+            for spelling in spellings:
+                self._insert(self.section_trie, spelling, skill)
+
+    def _insert(self, trie, spelling, skill):
+        tokens = _tokens(spelling)
+        if not tokens:
+            raise ValueError(f"Empty spelling for {skill}")
+        node = trie
+        for token in tokens:
+            node = node.setdefault(token, {})
+        if node.get(_END, skill) != skill:
+            raise ValueError(f"'{spelling}' is listed under {node[_END]} and {skill}")
+        node[_END] = skill
+        self.names.setdefault(" ".join(tokens), skill)
+
+    def _scan(self, tokens, trie, found):
+        i, n = 0, len(tokens)
+        while i < n:
+            node, match = trie, None
+            for j in range(i, n):
+                node = node.get(tokens[j])
+                if node is None:
+                    break
+                if _END in node:
+                    match = (node[_END], j + 1)
+            if match:
+                found[match[0]] = None
+                i = match[1]
+            else:
+                i += 1
+
+    def find(self, text, skills_section=False):
+        """
+        Skills mentioned in text, in order of first mention. With
+        skills_section=True the short ambiguous spellings ("c", "go",
+        "rest") count as well.
+        """
+        found = {}
+        self._scan(_tokens(text), self.section_trie if skills_section else self.trie, found)
+        return list(found)
+
+    def extract(self, sections):
+        """
+        Skills of a resume: everything in its skills section plus skills
+        mentioned in projects, experience and the other sections.
+        """
+        found = {}
+        for name in INDEXED_SECTIONS:
+            text = sections.get(name)
+            if text:
+                self._scan(_tokens(text), self.section_trie if name == "skills" else self.trie, found)
+        return list(found)
+
+    def canonical(self, name):
+        """
+        Taxonomy name for a skill name or any of its spellings, None if
+        it is not in the taxonomy.
+        """
+        return self.names.get(" ".join(_tokens(name)))
+
+
+_matcher = None
+
+
+def get_matcher():
+    global _matcher
+    if _matcher is None:
+        _matcher = SkillMatcher()
+    return _matcher
+
+
+def extract_skills(sections):
+    return get_matcher().extract(sections)
+
+
+def parse_query(query, matcher=None):
+    """
+    Parses a boolean skill filter such as "Python AND (AWS OR GCP) AND
+    NOT PHP" into nested tuples. AND binds tighter than OR; "," and "&"
+    mean AND, "|" means OR. Skills may be given by any spelling.
+    """
+    matcher = matcher or get_matcher()
+    tokens = []
+    for part in QUERY_SPLIT.split(query):
+        part = part.strip()
+        if not part:
+            continue
+        if part in ("(", ")"):
+            tokens.append(part)
+        elif part in QUERY_OPERATORS:
+            tokens.append(QUERY_OPERATORS[part])
+        else:
+            skill = matcher.canonical(part)
+            if skill is None:
+                raise ValueError(f"Unknown skill: {part}")
+            tokens.append(("skill", skill))
+    if not tokens:
+        raise ValueError("Empty skill filter")
+
+    pos = 0
+
+    def peek():
+        return tokens[pos] if pos < len(tokens) else None
+
+    def take(expected=None):
+        nonlocal pos
+        token = peek()
+        if token is None or (expected and token != expected):
+            raise ValueError(f"Expected {expected or 'a skill'} in skill filter: {query}")
+        pos += 1
+        return token
+
+    def any_of():
+        node = all_of()
+        while peek() == "OR":
+            take("OR")
+            node = ("or", node, all_of())
+        return node
+
+    def all_of():
+        node = unary()
+        while peek() == "AND":
+            take("AND")
+            node = ("and", node, unary())
+        return node
+
+    def unary():
+        token = peek()
+        if token == "NOT":
+            take("NOT")
+            return ("not", unary())
+        if token == "(":
+            take("(")
+            node = any_of()
+            take(")")
+            return node
+        if isinstance(token, tuple):
+            return take()
+        raise ValueError(f"Expected a skill in skill filter: {query}")
+
+    tree = any_of()
+    if pos != len(tokens):
+        raise ValueError(f"Unexpected '{tokens[pos]}' in skill filter: {query}")
+    return tree
+
+
+class SkillIndex:
+    """
+    Which resumes have which skill, as one bitset per skill.
+
+    Row s of `bits` is np.packbits of the has-skill flags of every resume
+    in the pool, so a boolean filter over the whole pool is a handful of
+    bitwise operations on byte arrays instead of a scan of resume text.
+    """
+
+    def __init__(self, matcher=None):
+        self.matcher = matcher or get_matcher()
+        self.resume_ids = []
+        self.positions = {}
+        self.bits = np.zeros((len(self.matcher.skills), 0), dtype=np.uint8)
+        self.signature = None
+
+    def __len__(self):
+        return len(self.resume_ids)
+
+    def build(self, resume_data):
+        resume_data = list(resume_data)
+        self.resume_ids = [r.get("Resume") or r.get("resume") for r in resume_data]
+        self.positions = {r: i for i, r in enumerate(self.resume_ids)}
+        self.signature = pool_signature(resume_data)
+
+        has = np.zeros((len(self.matcher.skills), len(resume_data)), dtype=bool)
+        for doc, r in enumerate(resume_data):
+            for skill in self.matcher.extract(r["sections"]):
+                has[self.matcher.ids[skill], doc] = True
+        self.bits = np.packbits(has, axis=1)
+
+    def _unpack(self, packed):
+        return np.unpackbits(packed, axis=-1, count=len(self.resume_ids)).astype(bool)
+
+    def _evaluate(self, node):
+        op = node[0]
+        if op == "skill":
+            return self.bits[self.matcher.ids[node[1]]]
+        if op == "not":
+            return np.invert(self._evaluate(node[1]))
+        combine = np.bitwise_and if op == "and" else np.bitwise_or
+        return combine(self._evaluate(node[1]), self._evaluate(node[2]))
+
+    def mask(self, query):
+        """
+        Boolean array over resume_ids: which resumes pass the filter.
+        """
+        return self._unpack(self._evaluate(parse_query(query, self.matcher)))
+
+    def match(self, query):
+        """
+        Resume ids passing a filter like "Python AND (AWS OR GCP)".
+        """
+        return [self.resume_ids[i] for i in np.flatnonzero(self.mask(query))]
+
+    def skills_of(self, resume_id):
+        pos = self.positions[resume_id]
+        column = (self.bits[:, pos >> 3] >> (7 - (pos & 7))) & 1
+        return [self.matcher.skills[s] for s in np.flatnonzero(column)]
+
+    def counts(self):
+        """
+        {skill: number of resumes}, most common first, skills nobody has left out.
+        """
+        totals = self._unpack(self.bits).sum(axis=1)
+        return {
+            self.matcher.skills[s]: int(totals[s])
+            for s in np.argsort(-totals, kind="stable") if totals[s]
+        }
+
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, "bits.npy"), self.bits)
+        meta_path = os.path.join(directory, "meta.json")
+        with open(meta_path + ".tmp", "w") as f:
+            json.dump({
+                "skills": self.matcher.skills,
+                "signature": self.signature,
+                "resume_ids": self.resume_ids
+            }, f)
+        os.replace(meta_path + ".tmp", meta_path)
+
+    def load(self, directory):
+        meta_path = os.path.join(directory, "meta.json")
+        bits_path = os.path.join(directory, "bits.npy")
+        if not os.path.exists(meta_path) or not os.path.exists(bits_path):
+            return False
+
+        with open(meta_path) as f:
+            meta = json.load(f)
+        # Saved against another taxonomy: the rows mean different skills
+        if meta.get("skills") != self.matcher.skills:
+            return False
+
+        self.bits = np.load(bits_path)
+        self.signature = meta["signature"]
+        self.resume_ids = meta["resume_ids"]
+        self.positions = {r: i for i, r in enumerate(self.resume_ids)}
+        return True
+
+    def sync(self, resume_data):
+        """
+        Rebuilds when resume_data differs from what was indexed. Returns
+        True if it did.
+        """
+        resume_data = list(resume_data)
+        if self.signature == pool_signature(resume_data):
+            return False
+        self.build(resume_data)
+        return True
@@ -0,0 +1,220 @@
+import os
+import sys
+import json
+import time
+import threading
+
+from backend.ingest import ingest_files
+from backend.extraction_cache import ExtractionCache
+from backend.resume_store import ResumeStore
+from backend.jobs import POOL_LOCK
+from backend.dedup import collapse_duplicates
+
+SUPPORTED = (".pdf", ".docx", ".txt")
+
+# Names editors and browsers use while a file is still being written
+PARTIAL_SUFFIXES = (".part", ".tmp", ".crdownload", ".download")
+
+
+def _watchable(name):
+    lower = name.lower()
+    return (
+        lower.endswith(SUPPORTED)
+        and not lower.startswith((".", "~$"))
+        and not lower.endswith(PARTIAL_SUFFIXES)
+    )
+
+
+def _signature(path):
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+
+class DirectoryWatcher:
+    """
+    Reports resumes in `directory` that were added, changed or removed.
+
+    A file is only reported once its size and mtime have stayed the same
+    for `debounce` seconds, so half-copied uploads are not parsed. The
+    directory is re-scanned every `interval` seconds; when watchdog is
+    installed its inotify/FSEvents notifications trigger a scan right away.
+    Signatures of processed files are kept in state_path so a restart only
+    picks up what changed in the meantime.
+    """
+
+    def __init__(self, directory, on_batch, interval=2.0, debounce=2.0, state_path=None):
+        self.directory = directory
+        self.on_batch = on_batch
+        self.interval = interval
+        self.debounce = debounce
+        self.state_path = state_path
+        self.known = self._load_state()
+        self.pending = {}  # path -> (signature, unchanged since)
+        self.wake = threading.Event()
+        self.observer = None
+
+    def _load_state(self):
+        if not self.state_path or not os.path.exists(self.state_path):
+            return {}
+        with open(self.state_path) as f:
+            return json.load(f)
+
+    def _save_state(self):
+        if not self.state_path:
+            return
+        with open(self.state_path + ".tmp", "w") as f:
+            json.dump(self.known, f)
+        os.replace(self.state_path + ".tmp", self.state_path)
+
+    def poll(self, now=None):
+        """
+        One scan. Returns (ready, removed): paths that settled since they
+        last changed, and paths that disappeared.
+        """
+        now = time.monotonic() if now is None else now
+        current = {}
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if not _watchable(name) or not os.path.isfile(path):
+                continue
+            try:
+                current[path] = _signature(path)
+            except OSError:
+                continue  # deleted between listdir and stat
+
+        ready = []
+        for path, sig in current.items():
+            if self.known.get(path) == sig:
+                self.pending.pop(path, None)
+                continue
+            seen = self.pending.get(path)
+            if seen is None or seen[0] != sig:
+                self.pending[path] = (sig, now)
+            elif now - seen[1] >= self.debounce:
+                ready.append(path)
+
+        removed = [p for p in self.known if p not in current]
+        for path in list(self.pending):
+            if path not in current:
+                del self.pending[path]
+        return sorted(ready), removed
+
+    def step(self, now=None):
+        ready, removed = self.poll(now)
+        if not ready and not removed:
+            return None
+
+        summary = self.on_batch(ready, removed)
+        for path in ready:
+            sig = self.pending.pop(path)[0]
+            self.known[path] = sig
+        for path in removed:
+            del self.known[path]
+        self._save_state()
+        return summary
+
+    def _start_observer(self):
+        try:
+            from watchdog.observers import Observer
+            from watchdog.events import FileSystemEventHandler
+        except ImportError:
+            return
+
+        wake = self.wake
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                wake.set()
+
+        self.observer = Observer()
+        self.observer.schedule(Handler(), self.directory, recursive=False)
+        self.observer.start()
+
+    def run(self, stop=None):
+        """
+        Scans until `stop` (a threading.Event) is set.
+        """
+        stop = stop or threading.Event()
+        self._start_observer()
+        try:
+            while not stop.is_set():
+                try:
+                    self.step()
+                except Exception as e:
+                    # The batch stays pending and is retried on a later scan
+                    print(f"⚠️  Watch batch failed: {type(e).__name__}: {e}", file=sys.stderr)
+                # A file still settling is re-checked once the debounce
+                # has passed, even without further events
+                timeout = min(self.interval, self.debounce) if self.pending else self.interval
+                self.wake.wait(timeout)
+                self.wake.clear()
+        finally:
+            if self.observer is not None:
+                self.observer.stop()
+                self.observer.join()
+
+
+class PoolUpdater:
+    """
+    Applies watcher batches to the saved pool: new or changed files are
+    extracted, scored and upserted into the store and search index (only
+    their text is embedded) unless they duplicate a pooled resume, removed
+    files are dropped, and the domain groups are recomputed.
+    """
+
+    def __init__(self, store_path, index_dir, embedding_cache_dir,
+                 extraction_cache_path=None, workers=None, timeout=60,
+                 max_pages=None, threshold=0.22):
+        from backend.semantic_search import ResumeSemanticSearch
+
+        self.index_dir = index_dir
+        self.workers = workers
+        self.timeout = timeout
+        self.max_pages = max_pages
+        self.threshold = threshold
+        self.store = ResumeStore(store_path)
+        self.cache = ExtractionCache(extraction_cache_path) if extraction_cache_path else None
+        self.engine = ResumeSemanticSearch(cache_dir=embedding_cache_dir)
+        with POOL_LOCK:
+            self.engine.load_index(index_dir)
+            if self.engine.sync(self.store.results()):
+                self.engine.save_index(index_dir)
+            # Read once; the store keeps it up to date after that
+            self.store.duplicate_index()
+
+    def __call__(self, changed, removed):
+        from backend.semantic_search import DOMAIN_QUERIES
+
+        results, failed = [], []
+        for r in ingest_files(changed, workers=self.workers, timeout=self.timeout,
+                              max_pages=self.max_pages, cache=self.cache):
+            if "error" in r:
+                failed.append(r)
+            else:
+                results.append({"resume": r["resume"], "score": r["score"], "sections": r["sections"]})
+
+        removed_ids = [os.path.basename(p) for p in removed]
+        with POOL_LOCK:
+            self.store.remove(removed_ids)
+            results, duplicates = collapse_duplicates(results, self.store.duplicate_index())
+            # A name listed twice is reported against itself and stays pooled
+            duplicate_ids = [d["resume"] for d in duplicates if d["resume"] != d["duplicate_of"]]
+            self.store.remove(duplicate_ids)
+            self.store.upsert(results)
+            self.engine.remove(removed_ids + duplicate_ids)
+            embedded = self.engine.upsert(results)
+            # Other processes (the app, the service) write to the store too;
+            # the index saved and classified here must cover all of it
+            self.engine.sync(self.store.results())
+            self.engine.save_index(self.index_dir)
+            self.store.set_domains(
+                self.engine.classify_by_domain(DOMAIN_QUERIES, threshold=self.threshold)
+            )
+
+        return {
+            "updated": results,
+            "failed": failed,
+            "duplicates": duplicates,
+            "removed": removed_ids,
+            "embedded": embedded
+        }
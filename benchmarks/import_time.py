@@ -0,0 +1,86 @@
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Entry points and the import time (ms, best of --repeat fresh
+# interpreters) they must stay under. None of them may load HEAVY_MODULES;
+# those belong to the first semantic call or the first PDF/DOCX parsed.
+BUDGETS_MS = {
+    "backend.quick_score": 400,
+    "backend.scorer": 300,
+    "backend.extractor": 300,
+    "backend.ingest": 400,
+    "backend.main": 500,
+    "backend.resume_store": 400,
+    "backend.jobs": 500,
+    "backend.semantic_search": 400,
+    "backend.chunked_search": 400,
+    "backend.lexical_index": 300,
+    "backend.skills": 300,
+    "backend.watcher": 500,
+}
+
+HEAVY_MODULES = ("torch", "sentence_transformers", "transformers", "sklearn",
+                 "pdfplumber", "docx", "pandas")
+
+PROBE = """
+import sys, time, json
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+heavy = sorted({{name.split(".")[0] for name in sys.modules}} & set({heavy!r}))
+print(json.dumps({{"ms": elapsed * 1000, "heavy": heavy}}))
+"""
+
+
+def measure(module, repeat):
+    best = None
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            cwd=BASE_DIR, capture_output=True, text=True, check=True
+        )
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        if best is None or result["ms"] < best["ms"]:
+            best = result
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Import time of the backend entry points against their budgets"
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="fresh interpreters per module")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="multiply every budget, e.g. 2 on a slow CI machine")
+    parser.add_argument("--output", default=None, help="write the report as JSON")
+    args = parser.parse_args()
+
+    report = []
+    over = 0
+    print(f"{'module':<28}{'ms':>8}{'budget':>8}  heavy imports")
+    for module, budget in BUDGETS_MS.items():
+        result = measure(module, args.repeat)
+        ok = result["ms"] <= budget * args.scale and not result["heavy"]
+        over += not ok
+        report.append(dict(result, module=module, budget_ms=budget, ok=ok))
+        print(
+            f"{module:<28}{result['ms']:>8.0f}{budget * args.scale:>8.0f}  "
+            f"{', '.join(result['heavy']) or '-'}{'' if ok else '   OVER BUDGET'}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if over:
+        print(f"\n{over} module(s) over budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import os
+import sys
+import json
+import argparse
+import tempfile
+
+import numpy as np
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from backend.vector_index import make_index, load_index, measure_recall, normalize_rows
+
+CONFIGS = [
+    ("float32 exact", "brute", {}, {}),
+    ("float16", "quantized", {"dtype": "float16"}, {}),
+    ("int8", "quantized", {"dtype": "int8"}, {}),
+    ("int8 + rerank x4", "quantized", {"dtype": "int8", "rerank": 4}, {}),
+    ("ivf nprobe=8", "ivf", {"nprobe": 8}, {})
+]
+
+
+def clustered_vectors(n, dim, clusters, rng, spread=2.8):
+    """
+    Unit vectors scattered around random centres, which is closer to
+    sentence embeddings than uniform noise.
+    """
+    centres = normalize_rows(rng.standard_normal((clusters, dim)))
+    picks = rng.integers(0, clusters, n)
+    return normalize_rows(centres[picks] + spread * rng.standard_normal((n, dim)) / np.sqrt(dim))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Recall, latency and memory of the quantized indexes against exact search"
+    )
+    parser.add_argument("--count", type=int, default=50000, help="vectors in the pool")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--vectors", default=None,
+                        help=".npy of real embeddings to use instead of synthetic ones")
+    parser.add_argument("--output", default=None, help="write the report as JSON")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    if args.vectors:
+        vectors = normalize_rows(np.load(args.vectors))
+    else:
+        vectors = clustered_vectors(args.count, args.dim, max(8, args.count // 500), rng)
+
+    # Queries are perturbed pool vectors so they have real neighbours
+    picks = rng.choice(len(vectors), args.queries, replace=False)
+    queries = normalize_rows(
+        vectors[picks] + 0.5 * rng.standard_normal((args.queries, vectors.shape[1])) / np.sqrt(vectors.shape[1])
+    )
+
+    exact = make_index("brute")
+    exact.build(vectors)
+
+    report = []
+    print(f"{len(vectors)} vectors x {vectors.shape[1]} dims, {args.queries} queries, recall@{args.k}\n")
+    print(f"{'index':<20}{'recall':>8}{'ms/query':>10}{'memory MB':>12}{'vs float32':>12}")
+    tmp = tempfile.TemporaryDirectory()
+    for i, (name, kind, params, search_params) in enumerate(CONFIGS):
+        index = make_index(kind, **params)
+        index.build(vectors)
+        # Measured as loaded from disk, the way the app uses it
+        path = os.path.join(tmp.name, f"index_{i}.npz")
+        index.save(path)
+        index = load_index(path, make_index(kind, **params))
+
+        result = measure_recall(index, exact, queries, args.k, **search_params)
+        result.update(
+            index=name,
+            memory_mb=round(index.memory_bytes() / 2 ** 20, 1),
+            memory_ratio=round(index.memory_bytes() / exact.memory_bytes(), 3)
+        )
+        report.append(result)
+        print(
+            f"{name:<20}{result['recall']:>8.3f}{result['ms_per_query']:>10.2f}"
+            f"{result['memory_mb']:>12}{result['memory_ratio']:>12}"
+        )
+
+    tmp.cleanup()
+    print("\nRe-ranked indexes read float32 rows from a memory-mapped file, which is not counted.")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
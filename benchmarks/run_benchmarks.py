@@ -0,0 +1,223 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import resource
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from backend.extractor import extract_text
+from backend.section_splitter import split_sections
+from backend.scorer import score_resume, score_batch, to_columns
+from backend.ingest import ingest_files
+from benchmarks.synthetic import FORMATS, generate_corpus
+
+RESUME_DIR = os.path.join(BASE_DIR, "resumes")
+RESULTS_DIR = os.path.join(BASE_DIR, "benchmarks", "results")
+
+SEARCH_QUERIES = [
+    "Machine learning intern with Python, NLP, and projects",
+    "Frontend developer with React and JavaScript",
+    "Cloud engineer with AWS, Docker and Kubernetes",
+    "Android developer with Kotlin",
+    "Data analyst with SQL, pandas and visualization"
+]
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(p / 100 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+def peak_rss_mb():
+    # Peak of the whole process so far, not of one stage, so it is
+    # reported once per run
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS, kilobytes elsewhere
+    if sys.platform == "darwin":
+        return round(peak / (1024 * 1024), 1)
+    return round(peak / 1024, 1)
+
+
+def summarize(durations, items=None):
+    """
+    durations are per-call seconds; items is how many resumes those calls
+    covered in total (defaults to one per call).
+    """
+    total = sum(durations)
+    items = len(durations) if items is None else items
+    return {
+        "calls": len(durations),
+        "items": items,
+        "total_s": round(total, 4),
+        "throughput_per_s": round(items / total, 2) if total else None,
+        "p50_ms": round(percentile(durations, 50) * 1000, 3),
+        "p95_ms": round(percentile(durations, 95) * 1000, 3)
+    }
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def bench_stages(paths):
+    stages = {"extract_text": [], "split_sections": [], "score_resume": [], "end_to_end": []}
+    results = []
+    report = {}
+
+    for path in paths:
+        text, t_extract = timed(extract_text, path)
+        sections, t_split = timed(split_sections, text)
+        score, t_score = timed(score_resume, sections)
+
+        stages["extract_text"].append(t_extract)
+        stages["split_sections"].append(t_split)
+        stages["score_resume"].append(t_score)
+        stages["end_to_end"].append(t_extract + t_split + t_score)
+
+        results.append({
+            "resume": os.path.basename(path),
+            "score": score,
+            "sections": sections
+        })
+
+    for name, durations in stages.items():
+        report[name] = summarize(durations)
+
+    columns = to_columns([r["sections"] for r in results])
+    _, t_batch = timed(score_batch, columns)
+    report["score_batch"] = summarize([t_batch], items=len(results))
+    return report, results
+
+
+def bench_ingest(paths, workers):
+    _, elapsed = timed(lambda: list(ingest_files(paths, workers=workers)))
+    report = summarize([elapsed], items=len(paths))
+    report["workers"] = workers
+    return report
+
+
+def bench_semantic(results, repeats):
+    from backend.semantic_search import ResumeSemanticSearch, DOMAIN_QUERIES, MODEL_NAME
+    from backend.model_registry import get_model
+
+    report = {}
+    _, load = timed(get_model, MODEL_NAME, True)
+    report["model_load"] = summarize([load], items=1)
+
+    # No embedding cache, so every resume is encoded
+    engine = ResumeSemanticSearch()
+    _, index = timed(engine.index_resumes, results)
+    report["index_resumes"] = summarize([index], items=len(results))
+
+    searches = []
+    for _ in range(repeats):
+        for query in SEARCH_QUERIES:
+            searches.append(timed(engine.search, query, 5)[1])
+    report["search"] = summarize(searches)
+
+    classify = [timed(engine.classify_by_domain, DOMAIN_QUERIES, 0.22)[1] for _ in range(repeats)]
+    report["classify_by_domain"] = summarize(classify, items=len(results) * repeats)
+    return report
+
+
+def compare(current, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    print(f"\nCompared with {baseline_path}\n")
+    print(f"{'stage':<28}{'p50 ms':>24}{'p95 ms':>24}{'items/s':>28}")
+    for group in ("stages", "ingest", "semantic"):
+        for stage, now in (current.get(group) or {}).items():
+            before = (baseline.get(group) or {}).get(stage)
+            if not before:
+                continue
+            cells = []
+            for key in ("p50_ms", "p95_ms", "throughput_per_s"):
+                old, new = before.get(key), now.get(key)
+                if not old or new is None:
+                    cells.append("-")
+                    continue
+                cells.append(f"{old:.2f}→{new:.2f} ({(new - old) / old * 100:+.0f}%)")
+            print(f"{group + '.' + stage:<28}{cells[0]:>24}{cells[1]:>24}{cells[2]:>28}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the resume analysis pipeline")
+    parser.add_argument("--count", type=int, default=300, help="synthetic resumes to generate")
+    parser.add_argument("--formats", default=",".join(FORMATS),
+                        help="comma separated subset of txt,docx,pdf")
+    parser.add_argument("--scale", type=int, default=1,
+                        help="repeat section bodies to make longer resumes")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="process pool size for the batch ingestion run")
+    parser.add_argument("--repeats", type=int, default=3, help="repeats for search timings")
+    parser.add_argument("--no-semantic", action="store_true",
+                        help="skip the embedding model stages")
+    parser.add_argument("--corpus-dir", default=None,
+                        help="write the corpus here instead of a temp dir")
+    parser.add_argument("--output", default=None, help="result JSON path")
+    parser.add_argument("--compare", default=None, help="baseline result JSON to diff against")
+    args = parser.parse_args()
+
+    formats = tuple(f.strip() for f in args.formats.split(",") if f.strip())
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus_dir = args.corpus_dir or tmp
+        paths, gen = timed(
+            generate_corpus, RESUME_DIR, corpus_dir, args.count, formats, args.scale
+        )
+        print(f"Generated {len(paths)} resumes ({', '.join(formats)}) in {gen:.1f}s")
+
+        report = {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "corpus": {
+                "count": len(paths),
+                "formats": formats,
+                "scale": args.scale,
+                "bytes": sum(os.path.getsize(p) for p in paths)
+            }
+        }
+
+        report["stages"], results = bench_stages(paths)
+        report["ingest"] = {"batch": bench_ingest(paths, args.workers)}
+
+    if not args.no_semantic:
+        report["semantic"] = bench_semantic(results, args.repeats)
+
+    for group in ("stages", "ingest", "semantic"):
+        for stage, r in (report.get(group) or {}).items():
+            print(
+                f"{group + '.' + stage:<28} p50 {r['p50_ms']:>9.3f} ms  "
+                f"p95 {r['p95_ms']:>9.3f} ms  {r['throughput_per_s'] or 0:>10.1f} items/s"
+            )
+    report["peak_rss_mb"] = peak_rss_mb()
+    print(f"peak rss {report['peak_rss_mb']} MB")
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, time.strftime("benchmark-%Y%m%d-%H%M%S.json")
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSaved {output}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import os
+import random
+
+from backend.section_splitter import split_sections
+
+FORMATS = ("txt", "docx", "pdf")
+
+
+def load_templates(resume_dir):
+    """
+    Splits every .txt resume in resume_dir into sections so synthetic
+    resumes can be assembled from real ones.
+    """
+    templates = []
+    for name in sorted(os.listdir(resume_dir)):
+        if not name.endswith(".txt"):
+            continue
+        with open(os.path.join(resume_dir, name), encoding="utf-8", errors="ignore") as f:
+            sections = split_sections(f.read())
+        templates.append({k: v.strip() for k, v in sections.items() if v.strip()})
+    return templates
+
+
+def make_resume(templates, rng, scale=1):
+    """
+    Builds one resume by taking each section from a random template.
+    `scale` repeats the body sections to simulate longer CVs.
+    """
+    lines = [f"Name: Candidate {rng.randint(1, 10 ** 6)}", ""]
+    for section in ("education", "skills", "projects", "experience", "achievements", "extras"):
+        donors = [t for t in templates if section in t]
+        if not donors:
+            continue
+        body = rng.choice(donors)[section]
+        lines.append(body)
+        # Repeat the content under the header, not the header itself
+        extra = body.split("\n", 1)[1] if "\n" in body else ""
+        for _ in range(scale - 1):
+            if extra:
+                lines.append(extra)
+        lines.append("")
+    return "\n".join(lines)
+
+
+def write_txt(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def write_docx(path, text):
+    from docx import Document
+
+    doc = Document()
+    for line in text.split("\n"):
+        doc.add_paragraph(line)
+    doc.save(path)
+
+
+def _pdf_escape(line):
+    line = line.encode("latin-1", errors="replace").decode("latin-1")
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path, text, lines_per_page=50):
+    """
+    Writes a plain text-only PDF (Helvetica, one text line per line) so
+    corpora can be generated without a PDF library.
+    """
+    lines = text.split("\n")
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in below
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"
+    ]
+    kids = []
+    for page_lines in pages:
+        stream = ["BT", "/F1 11 Tf", "14 TL", "50 780 Td"]
+        for line in page_lines:
+            stream.append(f"({_pdf_escape(line)}) Tj T*")
+        stream.append("ET")
+        content = "\n".join(stream).encode("latin-1")
+
+        objects.append(
+            b"<< /Length " + str(len(content)).encode() + b" >>\nstream\n" + content + b"\nendstream"
+        )
+        content_id = len(objects)
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>".encode()
+        )
+        kids.append(f"{len(objects)} 0 R")
+
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{i} 0 obj\n".encode() + body + b"\nendobj\n"
+
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+WRITERS = {
+    "txt": write_txt,
+    "docx": write_docx,
+    "pdf": write_pdf
+}
+
+
+def generate_corpus(resume_dir, out_dir, count, formats=FORMATS, scale=1, seed=0):
+    """
+    Writes `count` synthetic resumes to out_dir, cycling through formats.
+    Returns the list of file paths.
+    """
+    rng = random.Random(seed)
+    templates = load_templates(resume_dir)
+    os.makedirs(out_dir, exist_ok=True)
+
+    paths = []
+    for i in range(count):
+        fmt = formats[i % len(formats)]
+        path = os.path.join(out_dir, f"synthetic_{i:05d}.{fmt}")
+        WRITERS[fmt](path, make_resume(templates, rng, scale))
+        paths.append(path)
+    return paths
@@ -1,7 +1,6 @@
 import streamlit as st
 import os
 import sys
-import json
 import pandas as pd
 
 # ------------------ Page Config ------------------
@@ -16,16 +15,32 @@ BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if BASE_DIR not in sys.path:
     sys.path.insert(0, BASE_DIR)
 
-from backend.extractor import extract_text
-from backend.section_splitter import split_sections
-from backend.scorer import score_resume
-from backend.semantic_search import ResumeSemanticSearch, DOMAIN_QUERIES
+from backend.jobs import get_queue, pool_store, analyze_batch, DONE, FAILED
+from backend.scorer import WEIGHTS, rank
+from backend.semantic_search import MODEL_NAME
+from backend.model_registry import is_loaded, preload
+from backend import instrumentation
 
-RESUME_DIR = os.path.join(BASE_DIR, "resumes")
 OUTPUT_DIR = os.path.join(BASE_DIR, "outputs")
-os.makedirs(RESUME_DIR, exist_ok=True)
+EMBEDDING_CACHE_DIR = os.path.join(OUTPUT_DIR, "embedding_cache")
+SEARCH_INDEX_DIR = os.path.join(OUTPUT_DIR, "search_index")
+EXTRACTION_CACHE_PATH = os.path.join(OUTPUT_DIR, "extraction_cache.db")
+STORE_PATH = os.path.join(OUTPUT_DIR, "resumes.db")
+JOBS_DIR = os.path.join(OUTPUT_DIR, "jobs")
+
+# Pages past this are usually appended portfolios and are not parsed
+MAX_PDF_PAGES = 20
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+# One connection per server process, not one per rerun
+store = pool_store(STORE_PATH)
+if not len(store):
+    # Pools analyzed before the store existed were saved as JSON/CSV
+    store.import_outputs(OUTPUT_DIR)
+
+# Analyses run in the background, shared by every session of this server
+jobs = get_queue(JOBS_DIR, analyze_batch)
+
 DOMAIN_COLORS = {
     "Machine Learning": "#6366f1",
     "Data Science": "#22d3ee",
@@ -34,6 +49,10 @@ DOMAIN_COLORS = {
     "Android Development": "#ef4444"
 }
 
+# Load the encoder in the background while the user picks files
+if not is_loaded(MODEL_NAME):
+    preload(MODEL_NAME)
+
 # ------------------ Session State ------------------
 if "analysis_running" not in st.session_state:
     st.session_state.analysis_running = False
@@ -41,6 +60,18 @@ if "analysis_running" not in st.session_state:
 if "analysis_done" not in st.session_state:
     st.session_state.analysis_done = False
 
+if "job_id" not in st.session_state:
+    st.session_state.job_id = None
+
+# ------------------ Scoring Weights ------------------
+# Rankings are recomputed from the saved features, so moving a slider
+# never re-parses a resume
+st.sidebar.header("⚖️ Scoring Weights")
+weights = {
+    criterion: st.sidebar.slider(criterion, 0, 40, default, key=f"weight_{criterion}")
+    for criterion, default in WEIGHTS.items()
+}
+
 # ------------------ Header ------------------
 st.markdown("""
 <h1 class="gradient-text">🤖 AI Resume Intelligence</h1>
@@ -76,75 +107,70 @@ if analyze and not st.session_state.analysis_running:
         st.warning("Please upload at least one resume.")
         st.stop()
 
+    # Files are parsed in parallel on the server straight from the upload
+    # buffers; this session only polls
+    st.session_state.job_id = jobs.submit(
+        [(file.name, file.getbuffer()) for file in uploaded_files],
+        store_path=STORE_PATH,
+        index_dir=SEARCH_INDEX_DIR,
+        embedding_cache_dir=EMBEDDING_CACHE_DIR,
+        extraction_cache_path=EXTRACTION_CACHE_PATH,
+        timeout=60,
+        max_pages=MAX_PDF_PAGES
+    )
     st.session_state.analysis_running = True
     st.session_state.analysis_done = False
 
-    progress = st.progress(0)
-    status = st.empty()
-
-    results = []
-    extracted_data = {}
-    total = len(uploaded_files)
-
-    for idx, file in enumerate(uploaded_files, start=1):
-        status.write(f"🔍 Processing {file.name}")
-        progress.progress(int((idx / total) * 100))
-
-        path = os.path.join(RESUME_DIR, file.name)
-        with open(path, "wb") as f:
-            f.write(file.getbuffer())
-
-        text = extract_text(path)
-        sections = split_sections(text)
-        score = score_resume(sections)
-
-        results.append({
-            "resume": file.name,
-            "score": score,
-            "sections": sections
-        })
-
-        extracted_data[file.name] = sections
-
-    # ------------------ Save Outputs ------------------
-    ranking_df = pd.DataFrame(
-        [{"Resume": r["resume"], "Score": r["score"]} for r in results]
-    ).sort_values(by="Score", ascending=False)
-
-    ranking_df.to_csv(os.path.join(OUTPUT_DIR, "ranking.csv"), index=False)
-
-    with open(os.path.join(OUTPUT_DIR, "extracted.json"), "w") as f:
-        json.dump(extracted_data, f, indent=2)
+job = jobs.get(st.session_state.job_id) if st.session_state.job_id else None
+if job is None:
+    # The job is gone if the server restarted while it ran
+    st.session_state.analysis_running = False
 
-    search_engine = ResumeSemanticSearch()
-    search_engine.index_resumes(results)
+if job is not None and st.session_state.analysis_running:
+    state = job.snapshot()
 
-    domain_groups = search_engine.classify_by_domain(
-        DOMAIN_QUERIES,
-        threshold=0.22
-    )
-
-    with open(os.path.join(OUTPUT_DIR, "domains.json"), "w") as f:
-        json.dump(domain_groups, f, indent=2)
+    if state["status"] not in (DONE, FAILED):
+        st.progress(int(state["done"] / max(state["total"], 1) * 100))
+        st.write(f"🔍 {state['done']}/{state['total']} resumes: {state['stage']}")
+        # Wake up on the next change, or re-check after a second
+        job.wait(timeout=1.0, since=state)
+        st.rerun()
 
     st.session_state.analysis_running = False
-    st.session_state.analysis_done = True
 
-    status.success("✅ Resume analysis completed")
+    if state["failed"]:
+        st.warning("Could not process: " + ", ".join(
+            f"{f['resume']} ({f['error']})" for f in state["failed"]
+        ))
+
+    if state["status"] == FAILED:
+        st.error(f"Analysis failed: {state['error']}")
+    else:
+        duplicates = (jobs.result(job.id) or {}).get("duplicates", [])
+        if duplicates:
+            st.info("Skipped duplicates: " + ", ".join(
+                f"{d['resume']} (same as {d['duplicate_of']})" for d in duplicates
+            ))
+        st.session_state.analysis_done = True
+        st.success("✅ Resume analysis completed")
 
 # ------------------ Output Section ------------------
 if st.session_state.analysis_done:
 
     st.markdown("<div class='card'>", unsafe_allow_html=True)
     st.subheader("🏆 Ranked Resumes")
-    ranking_df = pd.read_csv(os.path.join(OUTPUT_DIR, "ranking.csv"))
+    if weights != WEIGHTS:
+        ranking = rank(*store.features(), weights)
+        st.caption("Ranked with the weights from the sidebar")
+    else:
+        ranking = store.ranking()
+    ranking_df = pd.DataFrame(ranking, columns=["Resume", "Score"])
     st.dataframe(ranking_df, use_container_width=True)
     st.markdown("</div>", unsafe_allow_html=True)
 
     st.subheader("🧠 Domain Classification")
 
-    with open(os.path.join(OUTPUT_DIR, "domains.json")) as f:
-        domain_groups = json.load(f)
+    domain_groups = store.domains()
 
     st.markdown("<div class='domain-grid'>", unsafe_allow_html=True)
 
@@ -167,6 +193,11 @@ if st.session_state.analysis_done:
     st.markdown("</div>", unsafe_allow_html=True)
     st.info(f"📄 {len(ranking_df)} resumes successfully analyzed")
 
+    # Only shown when the server was started with RESUME_PROFILE=1
+    if instrumentation.ENABLED:
+        with st.expander("⏱️ Pipeline timings"):
+            st.code(instrumentation.report())
+
 # ------------------ Styling ------------------
 st.markdown("""
 <style>
@@ -1,8 +1,6 @@
 import streamlit as st
 import os
 import sys
-import json
-import pandas as pd
 
 # ------------------ Path Setup ------------------
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
@@ -10,8 +8,25 @@ if BASE_DIR not in sys.path:
     sys.path.insert(0, BASE_DIR)
 
 from backend.semantic_search import ResumeSemanticSearch
+from backend.chunked_search import ChunkedResumeSearch
+from backend.vector_index import make_index
+from backend.lexical_index import BM25Index, hybrid_search
+from backend.skills import SkillIndex, parse_query
+from backend.jobs import POOL_LOCK, pool_store
 
 OUTPUT_DIR = os.path.join(BASE_DIR, "outputs")
+EMBEDDING_CACHE_DIR = os.path.join(OUTPUT_DIR, "embedding_cache")
+SEARCH_INDEX_DIR = os.path.join(OUTPUT_DIR, "search_index")
+CHUNK_INDEX_DIR = os.path.join(OUTPUT_DIR, "chunk_index")
+LEXICAL_INDEX_DIR = os.path.join(OUTPUT_DIR, "lexical_index")
+SKILL_INDEX_DIR = os.path.join(OUTPUT_DIR, "skill_index")
+STORE_PATH = os.path.join(OUTPUT_DIR, "resumes.db")
+
+# Pools at least this large are searched with the approximate IVF index
+ANN_MIN_RESUMES = 5000
+
+# In pools that large only the best keyword matches are scored semantically
+LEXICAL_PREFILTER = 2000
 
 st.set_page_config(page_title="Best Profile Fit", layout="wide")
 
@@ -20,19 +35,12 @@ if st.session_state.get("analysis_running", False):
     st.info("⏳ Analysis is running. Please wait for it to complete.")
     st.stop()
 
-ranking_path = os.path.join(OUTPUT_DIR, "ranking.csv")
-extracted_path = os.path.join(OUTPUT_DIR, "extracted.json")
+store = pool_store(STORE_PATH) if os.path.exists(STORE_PATH) else None
 
-if not os.path.exists(ranking_path) or not os.path.exists(extracted_path):
+if store is None or not len(store):
     st.warning("Please analyze resumes on the main page first.")
     st.stop()
 
-# ------------------ Load Data ------------------
-ranking_df = pd.read_csv(ranking_path)
-
-with open(extracted_path) as f:
-    extracted_data = json.load(f)
-
 # ------------------ UI ------------------
 st.markdown("""
 <h1 class="gradient-text">🎯 Best Profile Fit</h1>
@@ -48,46 +56,100 @@ job_query = st.text_area(
     placeholder="e.g. Machine learning intern with Python, NLP, and projects"
 )
 
-top_k = st.slider("Number of candidates", 1, 10, 5)
+required_skills = st.text_input(
+    "Required skills (optional)",
+    placeholder="e.g. Python AND (AWS OR GCP) AND NOT PHP"
+)
 
-st.markdown("</div>", unsafe_allow_html=True)
+top_k = st.slider("Number of candidates", 1, 10, 5)
 
-# ------------------ Matching ------------------
-if st.button("🔍 Find Best Fit"):
+# Long resumes are matched section by section instead of as one
+# truncated text
+by_section = st.checkbox("Match section by section (better for long resumes)")
 
-    search_engine = ResumeSemanticSearch()
+# Exact must-have terms ("Kotlin", "Kubernetes") count through BM25
+hybrid = st.checkbox("Boost exact keyword matches", value=True)
 
-    results = []
-    for resume, sections in extracted_data.items():
-        score = ranking_df.loc[
-            ranking_df["Resume"] == resume, "Score"
-        ].values[0]
+use_ann = len(store) >= ANN_MIN_RESUMES and not by_section
+if use_ann:
+    nprobe = st.slider(
+        "Search depth (higher is more accurate, lower is faster)", 1, 64, 8
+    )
 
-        results.append({
-            "resume": resume,
-            "score": score,
-            "sections": sections
-        })
+st.markdown("</div>", unsafe_allow_html=True)
 
-    search_engine.index_resumes(results)
+# ------------------ Matching ------------------
+if st.button("🔍 Find Best Fit"):
 
-    matches = search_engine.search(job_query, top_k=top_k)
+    if required_skills.strip():
+        try:
+            parse_query(required_skills)
+        except ValueError as e:
+            st.error(str(e))
+            st.stop()
+
+    if by_section:
+        search_engine = ChunkedResumeSearch(cache_dir=EMBEDDING_CACHE_DIR)
+        index_dir = CHUNK_INDEX_DIR
+    else:
+        index = make_index("ivf", nprobe=nprobe) if use_ann else make_index("brute")
+        search_engine = ResumeSemanticSearch(cache_dir=EMBEDDING_CACHE_DIR, index=index)
+        index_dir = SEARCH_INDEX_DIR
+
+    # Only resumes added or changed since the index was saved get embedded;
+    # the lock keeps a running analysis from saving the index meanwhile
+    results = store.results()
+    with POOL_LOCK:
+        search_engine.load_index(index_dir)
+        if search_engine.sync(results):
+            search_engine.save_index(index_dir)
+
+        skill_index = SkillIndex()
+        skill_index.load(SKILL_INDEX_DIR)
+        if skill_index.sync(results):
+            skill_index.save(SKILL_INDEX_DIR)
+
+        if hybrid:
+            lexical = BM25Index()
+            lexical.load(LEXICAL_INDEX_DIR)
+            if lexical.sync(results):
+                lexical.save(LEXICAL_INDEX_DIR)
+
+    # Only candidates with the required skills are ranked at all
+    allowed = set(skill_index.match(required_skills)) if required_skills.strip() else None
+
+    if hybrid:
+        prefilter = LEXICAL_PREFILTER if len(results) >= ANN_MIN_RESUMES else None
+        matches = [
+            (resume, similarity, bm25)
+            for resume, _, similarity, bm25 in hybrid_search(
+                search_engine, lexical, job_query, top_k=top_k, prefilter=prefilter, allowed=allowed
+            )
+        ]
+    elif allowed is not None:
+        matches = [(r, s, None) for r, s in search_engine.search_among(job_query, allowed, top_k=top_k)]
+    else:
+        matches = [(r, s, None) for r, s in search_engine.search(job_query, top_k=top_k)]
+
+    if allowed is not None:
+        st.caption(f"{len(allowed)} of {len(results)} resumes have the required skills.")
 
     st.subheader("🏆 Best Matching Candidates")
 
-    for resume, similarity in matches:
-        base_score = ranking_df.loc[
-            ranking_df["Resume"] == resume, "Score"
-        ].values[0]
+    for resume, similarity, bm25 in matches:
+        base_score = store.score(resume)
 
         fit_score = round((similarity * 100 + base_score) / 2, 2)
+        skills = ", ".join(skill_index.skills_of(resume)) if resume in skill_index.positions else ""
 
         st.markdown(
             f"""
             <div class="domain-card">
                 <div class="domain-title">📄 {resume}</div>
                 <div class="domain-item">Semantic Match: {round(similarity, 2)}</div>
+                {f'<div class="domain-item">Keyword Match: {round(bm25, 2)}</div>' if bm25 is not None else ''}
                 <div class="domain-item">Resume Score: {base_score}</div>
+                {f'<div class="domain-item">Skills: {skills}</div>' if skills else ''}
                 <div class="domain-item"><b>Overall Fit: {fit_score}</b></div>
             </div>
             """,
@@ -8,11 +8,14 @@ BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
 if BASE_DIR not in sys.path:
     sys.path.insert(0, BASE_DIR)
 
-from backend.extractor import extract_text
-from backend.section_splitter import split_sections
+from backend.ingest import load_sections
+from backend.extraction_cache import ExtractionCache
 from backend.scorer import score_resume
 from backend.semantic_search import ResumeSemanticSearch, DOMAIN_QUERIES
 
+EMBEDDING_CACHE_DIR = os.path.join(BASE_DIR, "outputs", "embedding_cache")
+EXTRACTION_CACHE_PATH = os.path.join(BASE_DIR, "outputs", "extraction_cache.db")
+
 st.set_page_config(page_title="Single Resume Analysis", layout="wide")
 
 # ------------------ UI Header ------------------
@@ -36,18 +39,15 @@ if not uploaded_file:
 
 # ------------------ Process Resume ------------------
 with st.spinner("Analyzing resume..."):
-    temp_path = os.path.join(BASE_DIR, "resumes", uploaded_file.name)
-    os.makedirs(os.path.dirname(temp_path), exist_ok=True)
-
-    with open(temp_path, "wb") as f:
-        f.write(uploaded_file.getbuffer())
-
-    text = extract_text(temp_path)
-    sections = split_sections(text)
+    # Parsed from the upload buffer; nothing is written to resumes/
+    os.makedirs(os.path.dirname(EXTRACTION_CACHE_PATH), exist_ok=True)
+    text, sections = load_sections(
+        (uploaded_file.name, uploaded_file.getbuffer()), ExtractionCache(EXTRACTION_CACHE_PATH)
+    )
     total_score, score_breakdown = score_resume(sections, return_breakdown=True)
 
 # ------------------ Semantic Domain Analysis ------------------
-search_engine = ResumeSemanticSearch()
+search_engine = ResumeSemanticSearch(cache_dir=EMBEDDING_CACHE_DIR)
 
 resume_payload = [{
     "resume": uploaded_file.name,
@@ -55,17 +55,15 @@ resume_payload = [{
     "sections": sections
 }]
 
+# The resume is the only text encoded here; the domain probes come from
+# the query cache
 search_engine.index_resumes(resume_payload)
 
-domain_scores = {}
-
-for domain, query in DOMAIN_QUERIES.items():
-    matches = search_engine.search(query, top_k=1)
-
-    if matches and matches[0][0] == uploaded_file.name:
-        domain_scores[domain] = matches[0][1]
-    else:
-        domain_scores[domain] = 0.0
+similarities = search_engine.score_queries(list(DOMAIN_QUERIES.values()), persist=True)[:, 0]
+domain_scores = {
+    domain: float(similarity)
+    for domain, similarity in zip(DOMAIN_QUERIES, similarities)
+}
 
 
 # ------------------ Layout ------------------
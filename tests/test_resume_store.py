@@ -0,0 +1,41 @@
+import os
+import sys
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from backend.resume_store import ResumeStore
+
+RESUME = {
+    "resume": "resume_1.txt",
+    "score": 42,
+    "sections": {"skills": "Python, SQL, Docker and AWS", "projects": "Built a resume analyzer"}
+}
+
+
+def test_opening_another_store_keeps_duplicate_index(tmp_path):
+    path = str(tmp_path / "resumes.db")
+    store = ResumeStore(path)
+    store.upsert([RESUME])
+    index = store.duplicate_index()
+
+    # Opening the same pool elsewhere (e.g. a Streamlit rerun) is not a write
+    ResumeStore(path).close()
+    assert store.duplicate_index() is index
+    assert "resume_1.txt" in index
+
+
+def test_write_from_another_store_rebuilds_duplicate_index(tmp_path):
+    path = str(tmp_path / "resumes.db")
+    store = ResumeStore(path)
+    store.upsert([RESUME])
+    index = store.duplicate_index()
+
+    other = ResumeStore(path)
+    other.upsert([dict(RESUME, resume="resume_2.txt")])
+    other.close()
+
+    rebuilt = store.duplicate_index()
+    assert rebuilt is not index
+    assert "resume_2.txt" in rebuilt